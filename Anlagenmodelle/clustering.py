@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+Clustering of the operating temperatures of a time series.
+
+@author: Markus Brandt
+
+An hourly year of feed flow and source temperatures contains only few
+distinct temperature pairs within the accuracy of the plant models. The
+pairs are quantised to a grid (or clustered by k-means) and only the
+representative points are characterised. Every hour is mapped back to the
+results of its cluster.
+"""
+
+import numpy as np
+import pandas as pd
+
+from scipy.cluster.vq import kmeans2
+
+
+def quantise(values, tol):
+    r"""
+    Round the temperature pairs to a grid and merge identical pairs.
+    Parameters
+    ----------
+    values : numpy.ndarray
+        Temperatures of shape (hours, columns).
+    tol : numeric/list
+        Grid spacing in K, scalar or one per column.
+    Returns
+    -------
+    centers : numpy.ndarray
+        Distinct grid points of shape (clusters, columns).
+    labels : numpy.ndarray
+        Cluster of every hour.
+    """
+    tol = np.broadcast_to(np.asarray(tol, dtype=float), values.shape[1:])
+    grid = np.round(values / tol) * tol
+    centers, labels = np.unique(grid, axis=0, return_inverse=True)
+    return centers, labels.ravel()
+
+
+def kmeans(values, n, seed=0):
+    r"""
+    Cluster the temperature pairs by k-means.
+    Parameters
+    ----------
+    values : numpy.ndarray
+        Temperatures of shape (hours, columns).
+    n : int
+        Number of clusters, empty clusters are dropped.
+    seed : int
+        Seed of the initialisation.
+    Returns
+    -------
+    centers : numpy.ndarray
+        Cluster centers of shape (clusters, columns).
+    labels : numpy.ndarray
+        Cluster of every hour.
+    """
+    centers, labels = kmeans2(values, n, minit='++', seed=seed)
+    used, labels = np.unique(labels, return_inverse=True)
+    return centers[used], labels.ravel()
+
+
+def cluster_temperatures(data, columns=('T_VL', 'T_water_amb'), tol=1,
+                         n=None):
+    r"""
+    Reduce the temperature rows of a time series to representative points.
+    Parameters
+    ----------
+    data : pandas.core.frame.DataFrame
+        Time series with the temperature columns.
+    columns : tuple
+        Names of the temperature columns.
+    tol : numeric/list
+        Grid spacing of the quantisation in K.
+    n : int
+        Number of k-means clusters, the quantisation is used if None.
+    Returns
+    -------
+    representatives : pandas.core.frame.DataFrame
+        One row per cluster with the temperature columns and the number of
+        hours it covers.
+    labels : numpy.ndarray
+        Cluster of every row of `data`.
+    """
+    values = data[list(columns)].to_numpy(dtype=float)
+    if n is None:
+        centers, labels = quantise(values, tol)
+    else:
+        centers, labels = kmeans(values, n)
+
+    representatives = pd.DataFrame(centers, columns=list(columns))
+    representatives['hours'] = np.bincount(labels,
+                                           minlength=len(representatives))
+    return representatives, labels
+
+
+def cluster_report(data, representatives, labels):
+    """Return points solved, hours covered and the deviation of the hours."""
+    columns = [c for c in representatives.columns if c != 'hours']
+    deviation = np.abs(data[columns].to_numpy(dtype=float) -
+                       representatives[columns].to_numpy()[labels])
+    return ('{0} points cover {1} hours, max. deviation: {2}'.format(
+        len(representatives), len(labels),
+        ', '.join('{0} {1:.2f} K'.format(c, d)
+                  for c, d in zip(columns, deviation.max(axis=0)))))
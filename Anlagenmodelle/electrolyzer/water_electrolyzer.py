@@ -9,166 +9,265 @@ TESPy model of an water electrolyzer for district heating
 
 # %% imports
 
-import matplotlib.pyplot as plt
-
 import numpy as np
 
 import pandas as pd
 
-from scipy.stats import linregress
-
 from tespy.components import (sink, source, compressor,
                               water_electrolyzer)
 from tespy.connections import connection, bus
 from tespy.networks import network
 from tespy.tools.characteristics import char_line
 
+import os
 import os.path as path
+import sys
+
+sys.path.append(path.abspath(path.join(__file__, "../..")))
+from piecewise import optimal_piecewise, piecewise_table
+from plant import Plant
+from plotting import curve, render
+from result_cache import ResultCache, cached_sweep, fingerprint
+from sampling import adaptive_characterisation
+from solver import compare, read_log, summary
 
 # %% boundaries
 
 Hu      = 141.873524        # Energy content Hydrogen in MJ/kg
                             # Q_hydro = P_design * 0.8
                             # Hu = Q_hydro / comp_hydro.m.val
-Q_hydro = 30                # Hydrogen in MW
-eta_e   = 0.8               # Efficiency of the electrolyzer
-T_cw_cold = 50              # Temperature of cold cooling water
-T_cw_hot = 80               # Temperature of hot cooling water
-
-# %% network
-
-fluid_list = ['O2', 'H2O', 'H2']
-
-nw = network(fluids=fluid_list, T_unit='C', p_unit='bar',
-             v_unit='l / s', iterinfo=False)
-
-
-# %% components
-
-fw = source('feed water')
-oxy = sink('oxygen sink')
-hydro = sink('hydrogen sink')
-cw_cold = source('cooling water source')
-cw_hot = sink('cooling water sink')
-comp = compressor('compressor', eta_s=0.9)
-el = water_electrolyzer('electrolyzer')
 
+compare_cold_start = False  # additionally solve every point from design
+plot = True                 # render the regression after the sweep
 
-# %% connections
-
-fw_el = connection(fw, "out1", el, "in2")
-el_comp = connection(el, 'out3', comp, 'in1')
-comp_hydro = connection(comp, 'out1', hydro, 'in1')
-el_oxy = connection(el, 'out2', oxy, 'in1')
-
-cw_cold_el = connection(cw_cold, 'out1', el, 'in1')
-el_cw_hot = connection(el, 'out1', cw_hot, 'in1')
-
-nw.add_conns(fw_el, el_comp, comp_hydro, el_oxy, cw_cold_el, el_cw_hot)
-
-
-# %% busses
+dirpath = path.abspath(path.join(__file__, "../../.."))
+cachepath = path.join(dirpath, '.cache', 'results')
+logpath = path.join(dirpath, '.cache', 'solver')
 
-# create characteristic line for the compressor motor
-x = np.array([0.2, 0.4, 0.6, 0.8, 1.0, 1.1])
-y = np.array([0.85, 0.93, 0.95, 0.96, 0.97, 0.96])
-mot1 = char_line(x=x, y=y)
 
-power = bus('total power bus')
-power.add_comps({'comp': el, 'param': 'P'},
-                {'comp': comp, 'char': mot1})
-nw.add_busses(power)
+# %% model
+
+class WaterElectrolyzer(Plant):
+    r"""
+    Water electrolyzer with hydrogen compressor and cooling water circuit.
+    Parameters
+    ----------
+    Q_hydro : numeric
+        Hydrogen output in MW at design.
+    eta_e : numeric
+        Efficiency of the electrolyzer.
+    T_cw_cold : numeric
+        Temperature of cold cooling water.
+    T_cw_hot : numeric
+        Temperature of hot cooling water.
 
+    Offdesign points are defined by the electrical power `P` of the
+    electrolyzer in W.
+    """
 
-# %% parameters
+    name = 'water_electrolyzer'
+    script = __file__
 
-comp.set_attr(eta_s=0.9)
-el.set_attr(P=Q_hydro*1e6 / 0.8, eta=eta_e, pr_c=0.99, design=['eta', 'pr_c'],
-            offdesign=['eta_char', 'zeta'])
+    def __init__(self, Q_hydro=30, eta_e=0.8, T_cw_cold=50, T_cw_hot=80,
+                 **kwargs):
+        self.Q_hydro = Q_hydro
+        self.eta_e = eta_e
+        self.T_cw_cold = T_cw_cold
+        self.T_cw_hot = T_cw_hot
+        super().__init__(**kwargs)
 
-fw_el.set_attr(p=10, T=15)
-cw_cold_el.set_attr(p=5, T=T_cw_cold, fluid={'H2O': 1, 'H2': 0, 'O2': 0})
-el_cw_hot.set_attr(T=T_cw_hot)
+    def build(self):
+        """Create the electrolyzer network."""
+        # network
 
-comp_hydro.set_attr(p=25)
-el_comp.set_attr(T=50)
+        fluid_list = ['O2', 'H2O', 'H2']
 
-comp.char_warnings=False
-el.char_warnings=False
+        nw = network(fluids=fluid_list, T_unit='C', p_unit='bar',
+                     v_unit='l / s', iterinfo=False)
 
+        # components
 
-# %% solving
+        fw = source('feed water')
+        oxy = sink('oxygen sink')
+        hydro = sink('hydrogen sink')
+        cw_cold = source('cooling water source')
+        cw_hot = sink('cooling water sink')
+        comp = compressor('compressor', eta_s=0.9)
+        el = water_electrolyzer('electrolyzer')
 
-# Design - Mode
+        # connections
 
-nw.solve('design')
-nw.print_results()
-nw.save('water_electrolyzer')
-P_design = el.P.val
+        fw_el = connection(fw, "out1", el, "in2")
+        el_comp = connection(el, 'out3', comp, 'in1')
+        comp_hydro = connection(comp, 'out1', hydro, 'in1')
+        el_oxy = connection(el, 'out2', oxy, 'in1')
 
-# Offdesign - Mode
+        cw_cold_el = connection(cw_cold, 'out1', el, 'in1')
+        el_cw_hot = connection(el, 'out1', cw_hot, 'in1')
 
-Hydro = []
-Q = []
-P = []
-eta = []
+        nw.add_conns(fw_el, el_comp, comp_hydro, el_oxy, cw_cold_el,
+                     el_cw_hot)
 
-for workload in np.linspace(0.2,1,9)*P_design:
-    el.set_attr(P=workload)
-    
-    nw.solve('offdesign', init_path='water_electrolyzer',
-              design_path='water_electrolyzer')
-    
-    Hydro       += [comp_hydro.m.val * Hu]
-    Q           += [el.Q.val]
-    P           += [power.P.val/1e6]
-    eta         += [(comp_hydro.m.val * Hu) / (power.P.val/1e6)]
+        # busses
 
-# # Temperature influence
+        # create characteristic line for the compressor motor
+        x = np.array([0.2, 0.4, 0.6, 0.8, 1.0, 1.1])
+        y = np.array([0.85, 0.93, 0.95, 0.96, 0.97, 0.96])
+        mot1 = char_line(x=x, y=y)
 
-# el_cw_hot.set_attr(T=np.nan)
+        power = bus('total power bus')
+        power.add_comps({'comp': el, 'param': 'P'},
+                        {'comp': comp, 'char': mot1})
+        nw.add_busses(power)
 
-# T_range = np.linspace(80,120,40)
+        # parameters
 
-# for T in T_range:
-#     el_cw_hot.set_attr(T=T)
-    
-#     nw.solve('offdesign', init_path='water_electrolyzer',
-#              design_path='water_electrolyzer')
-    
-#     print('Systemwirkungsgrad: ' + str(comp_hydro.m.val * Hu /(power.P.val/1e6)))
+        comp.set_attr(eta_s=0.9)
+        el.set_attr(P=self.Q_hydro*1e6 / 0.8, eta=self.eta_e, pr_c=0.99,
+                    design=['eta', 'pr_c'], offdesign=['eta_char', 'zeta'])
 
-# %% analysis
+        fw_el.set_attr(p=10, T=15)
+        cw_cold_el.set_attr(p=5, T=self.T_cw_cold,
+                            fluid={'H2O': 1, 'H2': 0, 'O2': 0})
+        el_cw_hot.set_attr(T=self.T_cw_hot)
 
-# determining c0, c1 for the oemof OffsetTransformer
-# Linear regression: Hydro_nutz = a + b * E_zu
-c1, c0, r, p, std = linregress(P, Hydro)
+        comp_hydro.set_attr(p=25)
+        el_comp.set_attr(T=50)
 
-solph_komp = {'P_in_max / MW': max(P), 'P_in_min / MW': min(P),
-              'c_1': c1, 'c_0': c0}
-df = pd.DataFrame([solph_komp])
+        comp.char_warnings=False
+        el.char_warnings=False
 
-dirpath = path.abspath(path.join(__file__, "../../.."))
-writepath = path.join(dirpath, 'Eingangsdaten', 'electrolyzer.csv')
-df.to_csv(writepath, sep=';', na_rep='#N/A', index=False)
+        self.nw = nw
+        self.el = el
+        self.power = power
+        self.comp_hydro = comp_hydro
+        self.el_cw_hot = el_cw_hot
 
-# Plot of linear regression
-plt.scatter(P, Hydro)
-plt.plot([0,max(P)],[c0,c0+max(P)*c1],c="red",alpha=0.5)
-plt.plot()
+    def set_point(self, P):
+        """Parametrise an offdesign point."""
+        self.el.set_attr(P=P)
 
-plt.xlim(min(P),max(P))
-plt.ylim(0,max(Hydro))
+    def results(self):
+        """Return hydrogen output and electrical power in MW."""
+        return {'Hydro': self.comp_hydro.m.val * Hu,
+                'P_el': self.power.P.val/1e6}
 
-plt.text(20, 14, r'y = {0} + {1}x (r={2})'.format(round(c0,3),
-                                                  round(c1,3),
-                                                  round(r,3)), fontsize=10)
-plt.xlabel("P$_{el,input}$ (MW)")
-plt.ylabel("H$_2$-Output (MW)")
-plt.grid(alpha=0.4)
 
-plt.show()
+# %% solving
 
-writepath = path.join(dirpath,
-                      'Abbildungen', 'LinearRegression_Electrolyzer.pdf')
-plt.savefig(writepath)
\ No newline at end of file
+if __name__ == '__main__':
+
+    # every solve, also in the worker processes, is logged to a fresh file
+    os.environ.setdefault('POPDH_SOLVER_LOG', logpath)
+    logfile = path.join(os.environ['POPDH_SOLVER_LOG'],
+                        WaterElectrolyzer.name + '.jsonl')
+    if path.isfile(logfile):
+        os.remove(logfile)
+
+    # Design - Mode
+
+    electrolyzer = WaterElectrolyzer()
+    parameters = {'Q_hydro': electrolyzer.Q_hydro,
+                  'eta_e': electrolyzer.eta_e,
+                  'T_cw_cold': electrolyzer.T_cw_cold,
+                  'T_cw_hot': electrolyzer.T_cw_hot}
+    model = fingerprint([__file__], parameters)
+    electrolyzer.design()
+    electrolyzer.nw.print_results()
+
+    # the design state is rewritten on every run, cached results are only
+    # reused in the next run if the fingerprint does not depend on it
+    assert fingerprint([__file__], parameters) == model
+    P_design = electrolyzer.el.P.val
+
+    # Offdesign - Mode
+
+    if compare_cold_start:
+        # own log, so the summary of the warm started sweep is not skewed
+        cold = WaterElectrolyzer(
+            warm_start=False,
+            logpath=path.join(os.environ['POPDH_SOLVER_LOG'],
+                              WaterElectrolyzer.name + '_cold.jsonl'))
+        cold.solver.model = WaterElectrolyzer.name + '_cold'
+        if path.isfile(cold.solver.logpath):
+            os.remove(cold.solver.logpath)
+
+    # only points not solved in a previous run with identical model
+    cache = ResultCache('water_electrolyzer', [__file__], cachepath,
+                        parameters=parameters)
+
+    def solve(workloads):
+        # every round starts at the highest load, every solve is initialised
+        # from the previous one
+        points = [{'P': workload * P_design} for workload in workloads]
+
+        def sweep(points):
+            return electrolyzer.characterise(points)[
+                ['Hydro', 'P_el', 'converged']].to_dict('records')
+
+        if compare_cold_start:
+            # both models solve the same points, the cache is bypassed
+            cold.characterise(points)
+            results = sweep(points)
+        else:
+            results = cached_sweep(cache, points, sweep)
+        return ([result['P_el'] for result in results],
+                [result['Hydro'] for result in results])
+
+    # midpoints of the workload range are only solved where the
+    # characteristic deviates from the straight line
+    sampler = adaptive_characterisation(solve, 0.2, 1)
+    P, Hydro = sampler.characteristic()
+
+    # solver telemetry: slowest points and failed solves
+    overview, slowest = summary(read_log(logfile))
+    print(overview)
+    print(slowest)
+    if compare_cold_start:
+        print(compare(cold.solver.report(), electrolyzer.solver.report()))
+    print(cache.stats())
+
+    # # Temperature influence
+
+    # electrolyzer.el_cw_hot.set_attr(T=np.nan)
+
+    # T_range = np.linspace(80,120,40)
+
+    # for T in T_range:
+    #     electrolyzer.el_cw_hot.set_attr(T=T)
+
+    #     electrolyzer.nw.solve('offdesign', init_path=electrolyzer.modelpath,
+    #                           design_path=electrolyzer.modelpath)
+
+    #     print('Systemwirkungsgrad: ' + str(electrolyzer.results()['Hydro'] /
+    #                                        electrolyzer.results()['P_el']))
+
+    # %% analysis
+
+    # determining c0, c1 for the oemof OffsetTransformer
+    # Linear regression: Hydro_nutz = a + b * E_zu
+    solph_komp = sampler.fit
+    print('{0} points, max. fit error: {1}'.format(solph_komp['points'],
+                                                   solph_komp['error']))
+
+    df = pd.DataFrame([solph_komp])[['P_in_max / MW', 'P_in_min / MW',
+                                     'c_1', 'c_0']]
+
+    writepath = path.join(dirpath, 'Eingangsdaten', 'electrolyzer.csv')
+    df.to_csv(writepath, sep=';', na_rep='#N/A', index=False)
+
+    # piecewise-linear characteristic
+    P_bp, Q_bp, error = optimal_piecewise(P, Hydro)
+    print('segments: {0}, max. fit error: {1}'.format(P_bp.shape[1] - 1,
+                                                     error.max()))
+
+    writepath = path.join(dirpath, 'Eingangsdaten', 'electrolyzer_pwl.csv')
+    piecewise_table(P_bp, Q_bp).to_csv(writepath, sep=';', na_rep='#N/A',
+                                       index=False)
+
+    # Plot of linear regression
+    if plot:
+        writepath = path.join(dirpath, 'Abbildungen',
+                              'LinearRegression_Electrolyzer.pdf')
+        render(writepath, [curve(P, Hydro, solph_komp)],
+               "P$_{el,input}$ (MW)", "H$_2$-Output (MW)")
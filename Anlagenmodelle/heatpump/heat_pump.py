@@ -7,14 +7,10 @@ Created on Wed Aug  5 13:41:41 2020
 
 # %% imports
 
-import matplotlib.pyplot as plt
-
 import numpy as np
 
 import pandas as pd
 
-from scipy.stats import linregress
-
 from tespy.networks import network
 from tespy.components import (
     sink, source, splitter, compressor, condenser, pump, heat_exchanger_simple,
@@ -24,265 +20,424 @@ from tespy.connections import bus, connection, ref
 from tespy.tools.characteristics import char_line
 from tespy.tools.characteristics import load_default_char as ldc
 
+import os
 import os.path as path
+import sys
 
+sys.path.append(path.abspath(path.join(__file__, "../..")))
+from clustering import cluster_report, cluster_temperatures
+from piecewise import optimal_piecewise, piecewise_table
+from plant import Plant
+from plotting import curve, render
+from result_cache import ResultCache, cached_sweep, fingerprint
+from sampling import AdaptiveSampler, adaptive_rows
+from solver import read_log, summary
+from surrogate import Surrogate, errors_summary
+from sweep import parallel_groups
 
-# %% importing data
 
-dirpath = path.abspath(path.join(__file__, "../../.."))
-readpath = path.join(dirpath, 'Eingangsdaten', 'fake_environmental_data.csv')
-data = pd.read_csv(readpath, sep=";")
+# %% paths
 
+dirpath = path.abspath(path.join(__file__, "../../.."))
+cachepath = path.join(dirpath, '.cache', 'results')
+logpath = path.join(dirpath, '.cache', 'solver')
 
 # %% boundaries
 
-workload = np.linspace(0.5, 1, 5)
-print(workload)
+use_surrogate = None        # interpolate annual series from a sampled grid,
+                            # None: only if the rows may need more solves
+                            # than the grid
+validate_surrogate = False  # additionally solve held-out points with TESPy
+cluster_tol = 1             # grid spacing of the temperature pairs in K
+max_points = 17             # maximum number of solves per row
+clusters = None             # number of k-means clusters instead of the grid
+plot = True                 # render the regressions after the sweep
+plot_in_background = True   # render in a separate process
 
 
-# %% network
+# %% model
 
-nw = network(
-    fluids=['water', 'NH3', 'air'], T_unit='C', p_unit='bar', h_unit='kJ / kg',
-    m_unit='kg / s'
-)
+class HeatPump(Plant):
+    r"""
+    Ammonia heat pump with river water as heat source.
+    Parameters
+    ----------
+    Q_design : numeric
+        Heat output to the consumer at design in W (negative).
+
+    Offdesign points are defined by the electrical power `P` in W, the feed
+    flow temperature `T_VL` and the river water temperature `T_water_amb`.
+    """
+
+    name = 'heat_pump'
+    script = __file__
 
+    def __init__(self, Q_design=-30*1e6, **kwargs):
+        self.Q_design = Q_design
+        super().__init__(**kwargs)
 
-# %% components
+    def build(self):
+        """Create the heat pump network."""
+        # network
 
-# sources & sinks
-cc = cycle_closer('coolant cycle closer')
-cb = source('consumer back flow')
-cf = sink('consumer feed flow')
-amb = source('ambient air')
-amb_out1 = sink('sink ambient 1')
-amb_out2 = sink('sink ambient 2')
+        nw = network(
+            fluids=['water', 'NH3', 'air'], T_unit='C', p_unit='bar',
+            h_unit='kJ / kg', m_unit='kg / s'
+        )
 
-# ambient air system
-sp = splitter('splitter')
-pu = pump('pump')
+        # components
 
-# consumer system
+        # sources & sinks
+        cc = cycle_closer('coolant cycle closer')
+        cb = source('consumer back flow')
+        cf = sink('consumer feed flow')
+        amb = source('ambient air')
+        amb_out1 = sink('sink ambient 1')
+        amb_out2 = sink('sink ambient 2')
 
-cd = condenser('condenser')
-dhp = pump('district heating pump')
-cons = heat_exchanger_simple('consumer')
+        # ambient air system
+        sp = splitter('splitter')
+        pu = pump('pump')
 
-# evaporator system
+        # consumer system
 
-ves = valve('valve')
-dr = drum('drum')
-ev = heat_exchanger('evaporator')
-su = heat_exchanger('superheater')
-erp = pump('evaporator reciculation pump')
+        cd = condenser('condenser')
+        dhp = pump('district heating pump')
+        cons = heat_exchanger_simple('consumer')
 
-# compressor-system
+        # evaporator system
 
-cp1 = compressor('compressor 1')
-cp2 = compressor('compressor 2')
-ic = heat_exchanger('intercooler')
+        ves = valve('valve')
+        dr = drum('drum')
+        ev = heat_exchanger('evaporator')
+        su = heat_exchanger('superheater')
+        erp = pump('evaporator reciculation pump')
 
+        # compressor-system
 
-# %% connections
+        cp1 = compressor('compressor 1')
+        cp2 = compressor('compressor 2')
+        ic = heat_exchanger('intercooler')
 
-# consumer system
+        # connections
 
-c_in_cd = connection(cc, 'out1', cd, 'in1')
+        # consumer system
 
-cb_dhp = connection(cb, 'out1', dhp, 'in1')
-dhp_cd = connection(dhp, 'out1', cd, 'in2')
-cd_cons = connection(cd, 'out2', cons, 'in1')
-cons_cf = connection(cons, 'out1', cf, 'in1')
+        c_in_cd = connection(cc, 'out1', cd, 'in1')
 
-nw.add_conns(c_in_cd, cb_dhp, dhp_cd, cd_cons, cons_cf)
+        cb_dhp = connection(cb, 'out1', dhp, 'in1')
+        dhp_cd = connection(dhp, 'out1', cd, 'in2')
+        cd_cons = connection(cd, 'out2', cons, 'in1')
+        cons_cf = connection(cons, 'out1', cf, 'in1')
 
-# connection condenser - evaporator system
+        nw.add_conns(c_in_cd, cb_dhp, dhp_cd, cd_cons, cons_cf)
 
-cd_ves = connection(cd, 'out1', ves, 'in1')
+        # connection condenser - evaporator system
 
-nw.add_conns(cd_ves)
+        cd_ves = connection(cd, 'out1', ves, 'in1')
 
-# evaporator system
+        nw.add_conns(cd_ves)
 
-ves_dr = connection(ves, 'out1', dr, 'in1')
-dr_erp = connection(dr, 'out1', erp, 'in1')
-erp_ev = connection(erp, 'out1', ev, 'in2')
-ev_dr = connection(ev, 'out2', dr, 'in2')
-dr_su = connection(dr, 'out2', su, 'in2')
+        # evaporator system
 
-nw.add_conns(ves_dr, dr_erp, erp_ev, ev_dr, dr_su)
+        ves_dr = connection(ves, 'out1', dr, 'in1')
+        dr_erp = connection(dr, 'out1', erp, 'in1')
+        erp_ev = connection(erp, 'out1', ev, 'in2')
+        ev_dr = connection(ev, 'out2', dr, 'in2')
+        dr_su = connection(dr, 'out2', su, 'in2')
 
-amb_p = connection(amb, 'out1', pu, 'in1')
-p_sp = connection(pu, 'out1', sp, 'in1')
-sp_su = connection(sp, 'out1', su, 'in1')
-su_ev = connection(su, 'out1', ev, 'in1')
-ev_amb_out = connection(ev, 'out1', amb_out1, 'in1')
+        nw.add_conns(ves_dr, dr_erp, erp_ev, ev_dr, dr_su)
 
-nw.add_conns(amb_p, p_sp, sp_su, su_ev, ev_amb_out)
+        amb_p = connection(amb, 'out1', pu, 'in1')
+        p_sp = connection(pu, 'out1', sp, 'in1')
+        sp_su = connection(sp, 'out1', su, 'in1')
+        su_ev = connection(su, 'out1', ev, 'in1')
+        ev_amb_out = connection(ev, 'out1', amb_out1, 'in1')
 
-# connection evaporator system - compressor system
+        nw.add_conns(amb_p, p_sp, sp_su, su_ev, ev_amb_out)
 
-su_cp1 = connection(su, 'out2', cp1, 'in1')
+        # connection evaporator system - compressor system
 
-nw.add_conns(su_cp1)
+        su_cp1 = connection(su, 'out2', cp1, 'in1')
 
-# compressor-system
+        nw.add_conns(su_cp1)
 
-cp1_he = connection(cp1, 'out1', ic, 'in1')
-he_cp2 = connection(ic, 'out1', cp2, 'in1')
-cp2_c_out = connection(cp2, 'out1', cc, 'in1')
+        # compressor-system
 
-sp_ic = connection(sp, 'out2', ic, 'in2')
-ic_out = connection(ic, 'out2', amb_out2, 'in1')
+        cp1_he = connection(cp1, 'out1', ic, 'in1')
+        he_cp2 = connection(ic, 'out1', cp2, 'in1')
+        cp2_c_out = connection(cp2, 'out1', cc, 'in1')
 
-nw.add_conns(cp1_he, he_cp2, sp_ic, ic_out, cp2_c_out)
+        sp_ic = connection(sp, 'out2', ic, 'in2')
+        ic_out = connection(ic, 'out2', amb_out2, 'in1')
 
+        nw.add_conns(cp1_he, he_cp2, sp_ic, ic_out, cp2_c_out)
 
-# %% busses
+        # busses
 
-# create characteristic line for the compressor motor
-x = np.array([0.2, 0.4, 0.6, 0.8, 1.0, 1.1])
-y = np.array([0.85, 0.93, 0.95, 0.96, 0.97, 0.96])
-mot1 = char_line(x=x, y=y)
+        # create characteristic line for the compressor motor
+        x = np.array([0.2, 0.4, 0.6, 0.8, 1.0, 1.1])
+        y = np.array([0.85, 0.93, 0.95, 0.96, 0.97, 0.96])
+        mot1 = char_line(x=x, y=y)
 
-power = bus('total power bus')
-power.add_comps({'comp': pu, 'char': mot1},
-                {'comp': erp, 'char': mot1},
-                {'comp': cp1, 'char': mot1},
-                {'comp': cp2, 'char': mot1},
-                {'comp': dhp, 'char': mot1})
-nw.add_busses(power)
+        power = bus('total power bus')
+        power.add_comps({'comp': pu, 'char': mot1},
+                        {'comp': erp, 'char': mot1},
+                        {'comp': cp1, 'char': mot1},
+                        {'comp': cp2, 'char': mot1},
+                        {'comp': dhp, 'char': mot1})
+        nw.add_busses(power)
 
+        # component parametrization
 
-# %% component parametrization
+        # condenser system
 
-# condenser system
+        cd.set_attr(pr1=0.99, pr2=0.99, ttd_u=5, design=['pr2', 'ttd_u'],
+                    offdesign=['zeta2', 'kA_char'])
+        dhp.set_attr(eta_s=0.8, design=['eta_s'], offdesign=['eta_s_char'])
+        cons.set_attr(pr=0.99, design=['pr'], offdesign=['zeta'])
 
-cd.set_attr(pr1=0.99, pr2=0.99, ttd_u=5, design=['pr2', 'ttd_u'],
-            offdesign=['zeta2', 'kA_char'])
-dhp.set_attr(eta_s=0.8, design=['eta_s'], offdesign=['eta_s_char'])
-cons.set_attr(pr=0.99, design=['pr'], offdesign=['zeta'])
+        # water pump
 
-# water pump
+        pu.set_attr(eta_s=0.75, design=['eta_s'], offdesign=['eta_s_char'])
 
-pu.set_attr(eta_s=0.75, design=['eta_s'], offdesign=['eta_s_char'])
+        # evaporator system
 
-# evaporator system
+        kA_char1 = ldc('heat exchanger', 'kA_char1', 'DEFAULT', char_line)
+        kA_char2 = ldc('heat exchanger', 'kA_char2', 'EVAPORATING FLUID',
+                       char_line)
 
-kA_char1 = ldc('heat exchanger', 'kA_char1', 'DEFAULT', char_line)
-kA_char2 = ldc('heat exchanger', 'kA_char2', 'EVAPORATING FLUID', char_line)
+        ev.set_attr(pr1=0.98, pr2=0.99, ttd_l=5,
+                    kA_char1=kA_char1, kA_char2=kA_char2,
+                    design=['pr1', 'ttd_l'], offdesign=['zeta1', 'kA_char'])
+        su.set_attr(pr1=0.98, pr2=0.99, ttd_u=2,
+                    design=['pr1', 'pr2', 'ttd_u'],
+                    offdesign=['zeta1', 'zeta2', 'kA_char'])
+        erp.set_attr(eta_s=0.8, design=['eta_s'], offdesign=['eta_s_char'])
 
-ev.set_attr(pr1=0.98, pr2=0.99, ttd_l=5,
-            kA_char1=kA_char1, kA_char2=kA_char2,
-            design=['pr1', 'ttd_l'], offdesign=['zeta1', 'kA_char'])
-su.set_attr(pr1=0.98, pr2=0.99, ttd_u=2, design=['pr1', 'pr2', 'ttd_u'],
-            offdesign=['zeta1', 'zeta2', 'kA_char'])
-erp.set_attr(eta_s=0.8, design=['eta_s'], offdesign=['eta_s_char'])
+        # compressor system
 
-# compressor system
+        cp1.set_attr(eta_s=0.85, design=['eta_s'], offdesign=['eta_s_char'])
+        cp2.set_attr(eta_s=0.9, pr=3, design=['eta_s'],
+                     offdesign=['eta_s_char'])
+        ic.set_attr(pr1=0.99, pr2=0.98, design=['pr1', 'pr2'],
+                    offdesign=['zeta1', 'zeta2', 'kA_char'])
 
-cp1.set_attr(eta_s=0.85, design=['eta_s'], offdesign=['eta_s_char'])
-cp2.set_attr(eta_s=0.9, pr=3, design=['eta_s'], offdesign=['eta_s_char'])
-ic.set_attr(pr1=0.99, pr2=0.98, design=['pr1', 'pr2'],
-            offdesign=['zeta1', 'zeta2', 'kA_char'])
+        # connection parametrization
 
+        # condenser system
 
-# %% connection parametrization
+        c_in_cd.set_attr(fluid={'air': 0, 'NH3': 1, 'water': 0})
+        cb_dhp.set_attr(T=60, p=10, fluid={'air': 0, 'NH3': 0, 'water': 1})
+        cd_cons.set_attr(T=100)
+        cons_cf.set_attr(h=ref(cb_dhp, 1, 0), p=ref(cb_dhp, 1, 0))
 
-# condenser system
+        # evaporator system cold side
 
-c_in_cd.set_attr(fluid={'air': 0, 'NH3': 1, 'water': 0})
-cb_dhp.set_attr(T=60, p=10, fluid={'air': 0, 'NH3': 0, 'water': 1})
-cd_cons.set_attr(T=100)
-cons_cf.set_attr(h=ref(cb_dhp, 1, 0), p=ref(cb_dhp, 1, 0))
+        erp_ev.set_attr(m=ref(ves_dr, 1.25, 0), p0=5)
+        su_cp1.set_attr(p0=5, state='g')
 
-# evaporator system cold side
+        # evaporator system hot side
 
-erp_ev.set_attr(m=ref(ves_dr, 1.25, 0), p0=5)
-su_cp1.set_attr(p0=5, state='g')
+        # pumping at constant rate in partload
+        amb_p.set_attr(T=12, p=2, fluid={'air': 0, 'NH3': 0, 'water': 1},
+                       offdesign=['v'])
+        sp_su.set_attr(offdesign=['v'])
+        ev_amb_out.set_attr(p=2, T=9, design=['T'])
 
-# evaporator system hot side
+        # compressor-system
 
-# pumping at constant rate in partload
-amb_p.set_attr(T=12, p=2, fluid={'air': 0, 'NH3': 0, 'water': 1},
-               offdesign=['v'])
-sp_su.set_attr(offdesign=['v'])
-ev_amb_out.set_attr(p=2, T=9, design=['T'])
+        he_cp2.set_attr(Td_bp=5, p0=20, design=['Td_bp'])
+        ic_out.set_attr(T=30, design=['T'])
 
-# compressor-system
+        # key paramter
 
-he_cp2.set_attr(Td_bp=5, p0=20, design=['Td_bp'])
-ic_out.set_attr(T=30, design=['T'])
+        cons.set_attr(Q=self.Q_design)
 
+        self.nw = nw
+        self.power = power
+        self.cons = cons
+        self.cd_cons = cd_cons
+        self.amb_p = amb_p
 
-# %% key paramter
+    def set_point(self, P, T_VL, T_water_amb):
+        """Parametrise an offdesign point."""
+        self.cons.set_attr(Q=np.nan)
+        self.power.set_attr(P=P)
+        self.cd_cons.set_attr(T=T_VL)
+        self.amb_p.set_attr(T=T_water_amb)
 
-Q_design = -30*1e6
-cons.set_attr(Q=Q_design)
+    def results(self):
+        """Return electrical power and heat in MW."""
+        return {'P_el': self.power.P.val / 1e6,
+                'Q': -self.cons.Q.val / 1e6}
 
 
 # %% calculation
 
-nw.solve('design')
-nw.print_results()
-nw.save('heat_pump')
-
-P_design = power.P.val
-print(P_design)
-
-# cons.set_attr(Q=np.nan)
-# cd_cons.set_attr(T=66)
-# amb_p.set_attr(T=25)
-# power.set_attr(P=16847531.92616716 * 0.5)
-# nw.solve('offdesign', init_path='heat_pump', design_path='heat_pump')
-
-df = pd.DataFrame()
-
-# Temperatur muss in gewissen Grenzen bleiben!
-i = 0
-for T_VL in data['T_VL']:
-    T_water_amb = data['T_water_amb'][i]
-
-    cons.set_attr(Q=np.nan)
-    
-    P = []
-    Q = []
-    
-    for wl in workload:
-        power.set_attr(P=P_design * wl)
-        cd_cons.set_attr(T=T_VL)
-        amb_p.set_attr(T=T_water_amb)
-             
-        nw.solve('offdesign', init_path='heat_pump', design_path='heat_pump')
-        
-        P += [power.P.val/1e6]
-        Q += [-cons.Q.val/1e6]
-        
-    c1, c0, r, p, std = linregress(P, Q)  
-    
-    solph_komp = pd.DataFrame([{'P_in_max / MW': max(P),
-                                'P_in_min / MW': min(P),
-                                'c_1': c1, 'c_0': c0}])
-    df = pd.concat([df, solph_komp])
-    
-    
-    plt.plot(P, Q)
-    plt.plot([0,max(P)],[c0,c0+max(P)*c1],c="red",alpha=0.5)
-    plt.plot()
-    
-    plt.xlim(min(P),max(P))
-    plt.ylim(0,max(Q))
-    
-    plt.text(8, 14, r'y = {0} + {1}x (r={2})'.format(round(c0,3),
-                                                      round(c1,3),
-                                                      round(r,3)), fontsize=10)
-    plt.xlabel("P (MW)")
-    plt.ylabel("$\dot{Q}$ (MW)")
-    plt.grid(alpha=0.4)
-    
-    plt.show()
-    
-    i += 1
-
-writepath = path.join(dirpath, 'Eingangsdaten', 'heat_pump.csv')
-df.to_csv(writepath, sep=';', na_rep='#N/A', index=False)
\ No newline at end of file
+if __name__ == '__main__':
+
+    # importing data
+    readpath = path.join(dirpath, 'Eingangsdaten',
+                         'fake_environmental_data.csv')
+    data = pd.read_csv(readpath, sep=";")
+
+    # every solve, also in the worker processes, is logged to a fresh file
+    os.environ.setdefault('POPDH_SOLVER_LOG', logpath)
+    logfile = path.join(os.environ['POPDH_SOLVER_LOG'],
+                        HeatPump.name + '.jsonl')
+    if path.isfile(logfile):
+        os.remove(logfile)
+
+    # only one representative per temperature cluster is characterised
+    representatives, labels = cluster_temperatures(data, tol=cluster_tol,
+                                                   n=clusters)
+    print(cluster_report(data, representatives, labels))
+
+    # boundaries, the workload range is sampled adaptively for every row
+    workload = (0.5, 1)
+
+    # design
+    heat_pump = HeatPump()
+    parameters = {'Q_design': heat_pump.Q_design}
+    model = fingerprint([__file__], parameters)
+    heat_pump.design()
+    heat_pump.nw.print_results()
+
+    # the design state is rewritten on every run, cached results are only
+    # reused in the next run if the fingerprint does not depend on it
+    assert fingerprint([__file__], parameters) == model
+
+    P_design = heat_pump.power.P.val
+    print(P_design)
+
+    axes = {'P': P_design * np.linspace(0.5, 1, 6),
+            'T_VL': np.arange(60, 111, 5),
+            'T_water_amb': np.arange(0, 26, 5)}
+    if use_surrogate is None:
+        use_surrogate = (len(representatives) * max_points >
+                         np.prod([len(v) for v in axes.values()]))
+
+    if use_surrogate:
+        # the offdesign space is sampled once, every row of the time series
+        # is interpolated from the table afterwards
+        surrogatepath = path.join(cachepath, 'heat_pump_surrogate.npz')
+
+        surrogate = None
+        if path.isfile(surrogatepath):
+            surrogate = Surrogate.load(surrogatepath, model=model)
+        if surrogate is None:
+            surrogate = Surrogate.sample(HeatPump, axes, ['P_el', 'Q'],
+                                         model=model)
+            surrogate.save(surrogatepath)
+
+        if validate_surrogate:
+            rng = np.random.default_rng(0)
+            held_out = data.sample(5, random_state=0)
+            points = [{'P': P_design * rng.uniform(0.5, 1), 'T_VL': T_VL,
+                       'T_water_amb': T_water_amb}
+                      for T_VL, T_water_amb in zip(held_out['T_VL'],
+                                                   held_out['T_water_amb'])]
+            print(errors_summary(surrogate.validate(heat_pump, points)))
+
+        cache = None
+
+        def solve_points(points):
+            predicted = surrogate.predict(
+                **{k: [point[k] for point in points]
+                   for k in surrogate.axes})
+            return [{'P_el': P_el, 'Q': Q}
+                    for P_el, Q in zip(predicted['P_el'], predicted['Q'])]
+
+    else:
+        # offdesign, every worker process builds its own network
+        # Temperatur muss in gewissen Grenzen bleiben!
+        # only points not solved in a previous run with identical model
+        cache = ResultCache('heat_pump', [__file__], cachepath,
+                            parameters=parameters)
+
+        def solve_points(points):
+            # the points of a row are sent to the same worker in descending
+            # workload, so that each solve starts from the point before
+            rows = {}
+            for k, point in enumerate(points):
+                rows.setdefault((point['T_VL'], point['T_water_amb']),
+                                []).append(k)
+            solved = parallel_groups(
+                HeatPump, HeatPump.offdesign,
+                [[points[k] for k in row] for row in rows.values()])
+            results = [None] * len(points)
+            for row, row_results in zip(rows.values(), solved):
+                for k, result in zip(row, row_results):
+                    results[k] = {'P_el': result['P_el'], 'Q': result['Q'],
+                                  'converged': result['converged']}
+            return results
+
+    def solve_requests(requests):
+        points = [{'P': P_design * wl,
+                   'T_VL': representatives['T_VL'][i],
+                   'T_water_amb': representatives['T_water_amb'][i]}
+                  for i, wl in requests]
+        if cache is None:
+            results = solve_points(points)
+        else:
+            results = cached_sweep(cache, points, solve_points)
+        return ([result['P_el'] for result in results],
+                [result['Q'] for result in results])
+
+    # the midpoints of the workload range are only solved where the P-Q
+    # characteristic deviates from the straight line
+    samplers = adaptive_rows(
+        solve_requests,
+        [AdaptiveSampler(*workload, max_points=max_points)
+         for i in range(len(representatives))])
+
+    df = pd.DataFrame()
+    curves = []
+
+    for i, sampler in enumerate(samplers):
+        P, Q = sampler.characteristic()
+        solph_komp = sampler.fit
+        df = pd.concat([df, pd.DataFrame([solph_komp])])
+
+        if plot:
+            curves += [curve(P, Q, solph_komp, title=(
+                'T_VL = {0} °C, T_water_amb = {1} °C'.format(
+                    representatives['T_VL'][i],
+                    representatives['T_water_amb'][i])))]
+
+    if plot:
+        writepath = path.join(dirpath, 'Abbildungen',
+                              'LinearRegression_HeatPump.pdf')
+        plotting = render(writepath, curves, "P (MW)", r"$\dot{Q}$ (MW)",
+                          grid=(3, 3), background=plot_in_background)
+
+    # solver telemetry: slowest points and failed solves
+    if path.isfile(logfile):
+        overview, slowest = summary(read_log(logfile))
+        print(overview)
+        print(slowest)
+    if cache is not None:
+        print(cache.stats())
+    print('points per row: {0}, max. fit error: {1}'.format(
+        df['points'].mean(), df['error'].max()))
+
+    # every hour gets the coefficients of its cluster
+    writepath = path.join(dirpath, 'Eingangsdaten', 'heat_pump.csv')
+    df = df[['P_in_max / MW', 'P_in_min / MW', 'c_1', 'c_0']].iloc[labels]
+    df.to_csv(writepath, sep=';', na_rep='#N/A', index=False)
+
+    # piecewise-linear characteristic of all rows, on the common grid of the
+    # bisection the solved points are reproduced exactly
+    P_rows, Q_rows = zip(*[sampler.interpolate(np.linspace(*workload, 17))
+                           for sampler in samplers])
+    P_bp, Q_bp, error = optimal_piecewise(np.array(P_rows), np.array(Q_rows))
+    print('segments: {0}, max. fit error: {1}'.format(P_bp.shape[1] - 1,
+                                                     error.max()))
+
+    writepath = path.join(dirpath, 'Eingangsdaten', 'heat_pump_pwl.csv')
+    df = piecewise_table(P_bp[labels], Q_bp[labels])
+    df.to_csv(writepath, sep=';', na_rep='#N/A', index=False)
+
+    if plot and plot_in_background:
+        plotting.join()
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+Piecewise-linear characterisation of the plant models.
+
+@author: Markus Brandt
+
+A single OffsetTransformer line loses accuracy at part load. Here, the solved
+points of a P-Q characteristic are approximated by a continuous curve of N
+linear segments. The breakpoints are chosen among the solved points by
+dynamic programming, so that the squared error is minimal. All rows (e.g.
+the temperature rows of a time series) are fitted at once, they need the
+same number of points per row.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def segment_errors(P, Q):
+    r"""
+    Squared error of every possible segment.
+    Parameters
+    ----------
+    P : numpy.ndarray
+        Input of shape (rows, points), ascending along the points.
+    Q : numpy.ndarray
+        Output of the same shape.
+    Returns
+    -------
+    errors : numpy.ndarray
+        Array of shape (rows, points, points); `errors[:, j, k]` is the sum
+        of squared deviations of the points j...k from the line through
+        point j and point k, inf for k <= j.
+    """
+    rows, n = P.shape
+    errors = np.full((rows, n, n), np.inf)
+    index = np.arange(n)
+
+    for j in range(n - 1):
+        dP = P[:, j + 1:] - P[:, [j]]
+        slope = (Q[:, j + 1:] - Q[:, [j]]) / np.where(dP == 0, np.nan, dP)
+        # deviation of every point i from the chord j-k: (rows, k, i)
+        line = Q[:, [j], None] + slope[:, :, None] * (
+            P[:, None, :] - P[:, [j], None])
+        inside = ((index[None, :] >= j) &
+                  (index[None, :] <= index[j + 1:, None]))
+        errors[:, j, j + 1:] = np.where(
+            inside, (line - Q[:, None, :]) ** 2, 0).sum(axis=2)
+
+    return errors
+
+
+def fit_piecewise(P, Q, segments, errors=None):
+    r"""
+    Fit a continuous piecewise-linear curve with a fixed number of segments.
+    Parameters
+    ----------
+    P : numpy.ndarray
+        Input of shape (rows, points), ascending along the points.
+    Q : numpy.ndarray
+        Output of the same shape.
+    segments : int
+        Number of segments, at most points - 1.
+    errors : numpy.ndarray
+        Result of :func:`segment_errors`, computed if not given.
+    Returns
+    -------
+    breakpoints : numpy.ndarray
+        Indices of the breakpoints of shape (rows, segments + 1).
+    sse : numpy.ndarray
+        Sum of squared errors of every row.
+    """
+    if errors is None:
+        errors = segment_errors(P, Q)
+    rows, n = P.shape
+    if not 1 <= segments <= n - 1:
+        raise ValueError('The number of segments must be between 1 and the '
+                         'number of points - 1.')
+
+    # cost[:, k]: minimal error of the first points up to k with s segments
+    cost = errors[:, 0, :]
+    choice = []
+    for s in range(1, segments):
+        total = cost[:, :, None] + errors
+        choice += [np.argmin(total, axis=1)]
+        cost = np.min(total, axis=1)
+
+    # backtracking from the last point
+    breakpoints = np.empty((rows, segments + 1), dtype=int)
+    breakpoints[:, -1] = n - 1
+    for s in range(segments - 1, 0, -1):
+        breakpoints[:, s] = np.take_along_axis(
+            choice[s - 1], breakpoints[:, [s + 1]], axis=1)[:, 0]
+    breakpoints[:, 0] = 0
+
+    return breakpoints, cost[:, -1]
+
+
+def optimal_piecewise(P, Q, tol=1e-3, max_segments=6):
+    r"""
+    Fit the smallest number of segments meeting the error bound in all rows.
+    Parameters
+    ----------
+    P : numpy.ndarray
+        Input of shape (rows, points), ascending along the points.
+    Q : numpy.ndarray
+        Output of the same shape.
+    tol : numeric
+        Maximum deviation of a point from the curve relative to the maximum
+        output of its row.
+    max_segments : int
+        Upper limit of the number of segments.
+    Returns
+    -------
+    P_bp : numpy.ndarray
+        Input at the breakpoints of shape (rows, segments + 1).
+    Q_bp : numpy.ndarray
+        Output at the breakpoints.
+    error : numpy.ndarray
+        Maximum relative deviation of every row.
+    """
+    P = np.atleast_2d(np.asarray(P, dtype=float))
+    Q = np.atleast_2d(np.asarray(Q, dtype=float))
+    errors = segment_errors(P, Q)
+    scale = np.max(np.abs(Q), axis=1)
+
+    for segments in range(1, min(max_segments, P.shape[1] - 1) + 1):
+        breakpoints, sse = fit_piecewise(P, Q, segments, errors=errors)
+        P_bp = np.take_along_axis(P, breakpoints, axis=1)
+        Q_bp = np.take_along_axis(Q, breakpoints, axis=1)
+        error = np.max(np.abs(
+            interpolate(P, P_bp, Q_bp) - Q), axis=1) / scale
+        if np.all(error <= tol):
+            break
+
+    return P_bp, Q_bp, error
+
+
+def interpolate(P, P_bp, Q_bp):
+    """Evaluate the piecewise-linear curves of all rows at P."""
+    P = np.atleast_2d(P)
+    # number of inner breakpoints left of P
+    segment = np.sum(P[:, :, None] > P_bp[:, None, 1:-1], axis=2)
+    P_0 = np.take_along_axis(P_bp, segment, axis=1)
+    P_1 = np.take_along_axis(P_bp, segment + 1, axis=1)
+    Q_0 = np.take_along_axis(Q_bp, segment, axis=1)
+    Q_1 = np.take_along_axis(Q_bp, segment + 1, axis=1)
+    return Q_0 + (Q_1 - Q_0) * (P - P_0) / (P_1 - P_0)
+
+
+def piecewise_table(P_bp, Q_bp):
+    r"""
+    Arrange the breakpoints in one row per curve for the csv export.
+    Parameters
+    ----------
+    P_bp : numpy.ndarray
+        Input at the breakpoints in MW.
+    Q_bp : numpy.ndarray
+        Output at the breakpoints in MW.
+    Returns
+    -------
+    df : pandas.core.frame.DataFrame
+        Columns `P_0 / MW` ... `P_N / MW` and `Q_0 / MW` ... `Q_N / MW`.
+    """
+    n = P_bp.shape[1]
+    df = pd.DataFrame(P_bp, columns=['P_{0} / MW'.format(i) for i in range(n)])
+    for i in range(n):
+        df['Q_{0} / MW'.format(i)] = Q_bp[:, i]
+    return df
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+Base class of the TESPy plant models.
+
+@author: Markus Brandt
+
+A plant builds its network once on instantiation. The network stays alive
+across design and offdesign calls, so a plant instance can be reused for
+long sweeps, e.g. in the worker processes of :func:`sweep.parallel_sweep`.
+"""
+
+import os
+import os.path as path
+
+import pandas as pd
+
+from scipy.stats import linregress
+
+from solver import WarmStartSolver
+
+
+class Plant:
+    r"""
+    TESPy plant model with design, offdesign and characterisation.
+    Parameters
+    ----------
+    modelpath : str
+        Path of the design state, defaults to the folder `name` next to the
+        plant script.
+    warm_start : bool
+        Initialise offdesign solves from the previously solved point.
+    logpath : str
+        JSON lines file of the solver log. Defaults to `<name>.jsonl` in the
+        directory given by the environment variable `POPDH_SOLVER_LOG` (also
+        seen by the worker processes of a sweep), no file if it is not set.
+    Note
+    ----
+    Subclasses implement :meth:`build` (create `self.nw` and keep the
+    handles needed later), :meth:`set_point` (parametrise an offdesign
+    point) and :meth:`results` (values of interest after a solve).
+    """
+
+    name = None
+    script = None
+
+    def __init__(self, modelpath=None, warm_start=True, logpath=None):
+        if modelpath is None:
+            modelpath = path.join(path.dirname(path.abspath(self.script)),
+                                  self.name)
+        self.modelpath = modelpath
+
+        if logpath is None and os.environ.get('POPDH_SOLVER_LOG'):
+            logpath = path.join(os.environ['POPDH_SOLVER_LOG'],
+                                self.name + '.jsonl')
+
+        self.build()
+        self.solver = WarmStartSolver(self.nw, self.modelpath,
+                                      warm_start=warm_start, model=self.name,
+                                      logpath=logpath)
+
+    def build(self):
+        """Create the network."""
+        raise NotImplementedError
+
+    def set_point(self, **point):
+        """Parametrise the network for an offdesign point."""
+        raise NotImplementedError
+
+    def results(self):
+        """Return the results of the last solve as dict."""
+        raise NotImplementedError
+
+    def design(self):
+        """Solve the design case, store the design state and return results."""
+        self.solver.design()
+        self.nw.save(self.modelpath)
+        return self.results()
+
+    def offdesign(self, **point):
+        """Solve an offdesign point, return its results and solver info."""
+        self.set_point(**point)
+        info = self.solver.solve(**point)
+        return {**info, **self.results()}
+
+    def characterise(self, grid):
+        r"""
+        Solve a list of offdesign points.
+        Parameters
+        ----------
+        grid : list/pandas.core.frame.DataFrame
+            Operating points as list of dicts or DataFrame with one column
+            per parameter.
+        Returns
+        -------
+        df : pandas.core.frame.DataFrame
+            Results and solver info of every point.
+        """
+        if isinstance(grid, pd.DataFrame):
+            grid = grid.to_dict('records')
+        return pd.DataFrame([self.offdesign(**point) for point in grid])
+
+
+def offset_transformer(P, Q):
+    r"""
+    Determine c_0, c_1 for the oemof OffsetTransformer by linear regression.
+    Parameters
+    ----------
+    P : list
+        Electrical input in MW.
+    Q : list
+        Output in MW.
+    Returns
+    -------
+    solph_komp : dict
+        Maximum and minimum input, slope c_1, offset c_0 and correlation r.
+    """
+    c1, c0, r, p, std = linregress(P, Q)
+    return {'P_in_max / MW': max(P), 'P_in_min / MW': min(P),
+            'c_1': c1, 'c_0': c0, 'r': r}
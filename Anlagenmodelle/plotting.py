@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+Plots of the plant characterisations.
+
+@author: Markus Brandt
+
+The characterisation runs only collect the curves and their regression.
+Rendering happens afterwards into a single multi-page pdf, optionally in a
+separate process, so the sweeps are not slowed down by matplotlib. The
+figures are created without pyplot, no figure stays open after rendering.
+"""
+
+import multiprocessing
+
+from matplotlib.backends.backend_pdf import PdfPages
+from matplotlib.figure import Figure
+
+
+def curve(P, Q, fit, title=None):
+    r"""
+    Collect a characteristic and its OffsetTransformer fit for plotting.
+    Parameters
+    ----------
+    P : list
+        Electrical input in MW.
+    Q : list
+        Output in MW.
+    fit : dict
+        Result of :func:`plant.offset_transformer`.
+    title : str
+        Title of the subplot.
+    """
+    return {'P': list(P), 'Q': list(Q), 'c_0': fit['c_0'], 'c_1': fit['c_1'],
+            'r': fit['r'], 'title': title}
+
+
+def plot_regression(ax, curve, xlabel, ylabel):
+    """Plot a characteristic and its regression line into an axis."""
+    P, Q = curve['P'], curve['Q']
+    c0, c1, r = curve['c_0'], curve['c_1'], curve['r']
+
+    ax.scatter(P, Q)
+    ax.plot([0, max(P)], [c0, c0 + max(P) * c1], c="red", alpha=0.5)
+
+    ax.set_xlim(min(P), max(P))
+    ax.set_ylim(0, max(Q))
+
+    ax.text(0.05, 0.9, r'y = {0} + {1}x (r={2})'.format(round(c0, 3),
+                                                        round(c1, 3),
+                                                        round(r, 3)),
+            fontsize=10, transform=ax.transAxes)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    ax.grid(alpha=0.4)
+    if curve['title'] is not None:
+        ax.set_title(curve['title'], fontsize=10)
+
+
+def render_pdf(writepath, curves, xlabel, ylabel, grid=(1, 1)):
+    r"""
+    Render the collected curves into a multi-page pdf.
+    Parameters
+    ----------
+    writepath : str
+        Path of the pdf.
+    curves : list
+        Curves collected by :func:`curve`.
+    xlabel : str
+        Label of the x-axis.
+    ylabel : str
+        Label of the y-axis.
+    grid : tuple
+        Rows and columns of small multiples per page.
+    """
+    rows, cols = grid
+    per_page = rows * cols
+    with PdfPages(writepath) as pdf:
+        for start in range(0, len(curves), per_page):
+            fig = Figure(figsize=(6.4 * cols ** 0.5, 4.8 * rows ** 0.5))
+            axes = fig.subplots(rows, cols, squeeze=False).ravel()
+            for ax, c in zip(axes, curves[start:start + per_page]):
+                plot_regression(ax, c, xlabel, ylabel)
+            for ax in axes[len(curves[start:start + per_page]):]:
+                ax.set_visible(False)
+            fig.tight_layout()
+            pdf.savefig(fig)
+
+
+def render(writepath, curves, xlabel, ylabel, grid=(1, 1), background=False):
+    r"""
+    Render the curves, optionally in a separate process.
+    Parameters
+    ----------
+    background : bool
+        Render in a separate process and return it without waiting, the
+        caller may `join()` it. Otherwise None is returned.
+
+    The other parameters are passed to :func:`render_pdf`.
+    """
+    if not background:
+        render_pdf(writepath, curves, xlabel, ylabel, grid=grid)
+        return None
+
+    process = multiprocessing.Process(
+        target=render_pdf, args=(writepath, curves, xlabel, ylabel),
+        kwargs={'grid': grid})
+    process.start()
+    return process
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""
+Persistent cache of solved operating points of TESPy plant models.
+
+@author: Markus Brandt
+
+A result is identified by the operating point parameters and a fingerprint
+of the model, i.e. the model script and its design parameters. Changing any
+of these invalidates the cached results of the model. The stored design
+state is not part of the fingerprint, it is rewritten on every run and
+TESPy saves the memory addresses of the objects with it.
+"""
+
+import hashlib
+import json
+import os
+import os.path as path
+
+
+def fingerprint(sources, parameters=None):
+    r"""
+    Hash the content of files and directories and the design parameters.
+    Parameters
+    ----------
+    sources : list
+        Paths to files or directories (all files are hashed recursively).
+    parameters : dict
+        Design parameters of the model.
+    Returns
+    -------
+    digest : str
+        Hex digest of the content.
+    """
+    digest = hashlib.sha1()
+    for source in sources:
+        if path.isdir(source):
+            files = sorted(
+                path.join(root, f) for root, dirs, fs in os.walk(source)
+                for f in fs)
+        else:
+            files = [source]
+
+        for f in files:
+            digest.update(path.relpath(f, source).encode())
+            with open(f, 'rb') as file:
+                digest.update(file.read())
+
+    if parameters is not None:
+        digest.update(json.dumps(parameters, sort_keys=True,
+                                 default=float).encode())
+
+    return digest.hexdigest()
+
+
+class ResultCache:
+    r"""
+    Results of operating points stored in a json file per model.
+    Parameters
+    ----------
+    name : str
+        Name of the plant model.
+    sources : list
+        Files and directories defining the model, e.g. the model script.
+    cachepath : str
+        Directory of the cache files.
+    parameters : dict
+        Design parameters of the model.
+    Note
+    ----
+    Only converged results are stored, every result carries its convergence
+    status as `converged`.
+    """
+
+    def __init__(self, name, sources, cachepath, parameters=None):
+        self.name = name
+        self.model = fingerprint(sources, parameters)
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(cachepath, exist_ok=True)
+        self.file = path.join(cachepath, name + '.json')
+
+        self.results = {}
+        if path.isfile(self.file):
+            with open(self.file) as file:
+                stored = json.load(file)
+            # results of an outdated model are discarded
+            if stored['model'] == self.model:
+                self.results = stored['results']
+
+    @staticmethod
+    def key(point):
+        """Get the key of an operating point."""
+        return json.dumps({k: float(v) for k, v in point.items()},
+                          sort_keys=True)
+
+    def get(self, point):
+        """Return the cached result of `point` or None."""
+        result = self.results.get(self.key(point))
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return result
+
+    def put(self, point, result):
+        """Add the result (dict of floats and `converged`) of `point`."""
+        self.results[self.key(point)] = {
+            k: bool(v) if k == 'converged' else float(v)
+            for k, v in result.items()}
+
+    def save(self):
+        """Write the cache to disk."""
+        with open(self.file, 'w') as file:
+            json.dump({'model': self.model, 'results': self.results}, file)
+
+    def stats(self):
+        """Return a summary of hits and misses."""
+        return ('{0} result cache: {1} hits, {2} misses, {3} points '
+                'stored'.format(self.name, self.hits, self.misses,
+                                len(self.results)))
+
+
+def cached_sweep(cache, points, solve):
+    r"""
+    Solve only the points missing in the cache.
+    Parameters
+    ----------
+    cache : ResultCache
+        Result cache of the model.
+    points : list
+        List of dicts with the operating point parameters.
+    solve : callable
+        Function solving a list of points, returning one dict of floats and
+        the convergence status `converged` per point.
+    Returns
+    -------
+    results : list
+        Result of every point in the order of `points`.
+    Note
+    ----
+    Points that did not converge are returned but not stored, so they are
+    solved again in the next run.
+    """
+    results = [cache.get(point) for point in points]
+    missing = [i for i, result in enumerate(results) if result is None]
+
+    if missing:
+        solved = solve([points[i] for i in missing])
+        for i, result in zip(missing, solved):
+            if result['converged']:
+                cache.put(points[i], result)
+            results[i] = result
+        cache.save()
+
+    return results
@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+"""
+Adaptive sampling of the workload range of a plant.
+
+@author: Markus Brandt
+
+Instead of a fixed grid, the workload range is bisected: starting with both
+endpoints, the midpoint of an interval is solved and the interval is only
+split further if the midpoint deviates from the straight line through its
+ends. Sampling stops as soon as the OffsetTransformer fit is stable and
+within the error bound, or no interval is left to refine.
+"""
+
+import warnings
+
+import numpy as np
+
+from plant import offset_transformer
+
+
+class AdaptiveSampler:
+    r"""
+    Bisection of the workload range of a single P-Q characteristic.
+    Parameters
+    ----------
+    lower : numeric
+        Lower end of the workload range.
+    upper : numeric
+        Upper end of the workload range.
+    tol : numeric
+        Maximum deviation from linearity relative to the maximum output,
+        applied to the interval midpoints and to the regression residuals.
+    stable : numeric
+        Maximum relative change of c_0 and c_1 between two rounds.
+    max_points : int
+        Maximum number of points solved.
+    Note
+    ----
+    The sampler is driven in rounds: :meth:`pending` returns the workloads to
+    solve next, :meth:`update` takes their results. Several samplers (e.g.
+    one per row of a time series) can be driven in the same round, so their
+    points are solved in one batch.
+
+    If `max_points` is reached, the intervals with the largest midpoint
+    deviation are refined first. A warning is issued if sampling ends with
+    a fit error above `tol`, either because `max_points` was reached or
+    because the characteristic is too curved for a single straight line.
+    """
+
+    def __init__(self, lower, upper, tol=1e-2, stable=1e-3, max_points=17):
+        self.tol = tol
+        self.stable = stable
+        self.max_points = max_points
+
+        self.points = {}
+        self.fit = None
+        self.done = False
+        self._open = []
+        self._pending = [upper, lower]
+
+    def pending(self):
+        """Return the workloads to solve in this round (descending)."""
+        if self.done:
+            return []
+        return sorted(self._pending, reverse=True)
+
+    def update(self, workloads, P, Q):
+        r"""
+        Add the results of the pending workloads and plan the next round.
+        Parameters
+        ----------
+        workloads : list
+            Solved workloads.
+        P : list
+            Electrical input in MW.
+        Q : list
+            Output in MW.
+        """
+        for wl, p, q in zip(workloads, P, Q):
+            self.points[wl] = (p, q)
+
+        if not self._open:
+            # first round: the whole range is the only interval
+            self._open = [(*sorted(self.points), np.inf)]
+        else:
+            self._open = self._refine()
+
+        previous = self.fit
+        self.fit = self._fit()
+
+        # largest deviation first, an interval is split because of the
+        # deviation of the midpoint of its parent
+        self._open.sort(key=lambda interval: interval[2], reverse=True)
+        self._pending = [(a + b) / 2 for a, b, deviation in self._open]
+
+        if not self._pending or len(self.points) >= self.max_points:
+            self.done = True
+        elif previous is not None and self._stable(previous):
+            self.done = True
+        elif len(self.points) + len(self._pending) > self.max_points:
+            # refine the largest deviations within the budget only
+            self._pending = self._pending[:self.max_points - len(self.points)]
+
+        if self.done and self.fit['error'] > self.tol:
+            if self._pending:
+                reason = ('max_points reached with intervals left to '
+                          'refine, increase max_points')
+            else:
+                # every interval passed the linearity test, but the single
+                # straight line does not fit the curved characteristic
+                reason = ('the global fit exceeds the error bound, use more '
+                          'segments (piecewise.optimal_piecewise)')
+            warnings.warn(
+                'Fit error {0:.3g} above tol {1:.3g} with {2} points: '
+                '{3}.'.format(self.fit['error'], self.tol, len(self.points),
+                              reason), RuntimeWarning)
+
+    def _refine(self):
+        r"""
+        Check the solved midpoints, return the intervals to split.
+        Intervals are tuples of both ends and the relative midpoint deviation
+        of the interval they were split from, intervals not solved in the
+        last round keep theirs.
+        """
+        scale = self._scale()
+        intervals = []
+        for a, b, deviation in self._open:
+            m = (a + b) / 2
+            if m not in self.points:
+                intervals += [(a, b, deviation)]
+                continue
+            (P_a, Q_a), (P_b, Q_b), (P_m, Q_m) = (
+                self.points[a], self.points[b], self.points[m])
+            Q_lin = Q_a + (Q_b - Q_a) * (P_m - P_a) / (P_b - P_a)
+            deviation = abs(Q_m - Q_lin) / scale
+            if deviation > self.tol:
+                intervals += [(a, m, deviation), (m, b, deviation)]
+        return intervals
+
+    def _fit(self):
+        P, Q = self.characteristic()
+        fit = offset_transformer(P, Q)
+        fit['error'] = (np.max(np.abs(fit['c_0'] + fit['c_1'] * P - Q)) /
+                        self._scale())
+        fit['points'] = len(P)
+        return fit
+
+    def _stable(self, previous):
+        scale = self._scale()
+        return (self.fit['error'] <= self.tol and
+                abs(self.fit['c_1'] - previous['c_1']) <=
+                self.stable * abs(previous['c_1']) and
+                abs(self.fit['c_0'] - previous['c_0']) <=
+                self.stable * scale)
+
+    def _scale(self):
+        return max(abs(q) for p, q in self.points.values())
+
+    def characteristic(self):
+        """Return P and Q of all solved points sorted by workload."""
+        P, Q = zip(*[self.points[wl] for wl in sorted(self.points)])
+        return np.array(P), np.array(Q)
+
+    def interpolate(self, workloads):
+        r"""
+        Return P and Q at given workloads by linear interpolation.
+        Parameters
+        ----------
+        workloads : numpy.ndarray
+            Workloads within the sampled range.
+        Returns
+        -------
+        P, Q : numpy.ndarray
+            Electrical input and output in MW.
+        Note
+        ----
+        Between the solved points, the characteristic deviates from the
+        straight line by less than `tol`. On the grid
+        `np.linspace(lower, upper, 2**k + 1)` the solved points are
+        reproduced exactly.
+        """
+        solved = sorted(self.points)
+        P, Q = self.characteristic()
+        return (np.interp(workloads, solved, P),
+                np.interp(workloads, solved, Q))
+
+
+def adaptive_characterisation(solve, lower, upper, **kwargs):
+    r"""
+    Sample a single P-Q characteristic adaptively.
+    Parameters
+    ----------
+    solve : callable
+        Called with a list of workloads, returns the lists P and Q in MW.
+    lower : numeric
+        Lower end of the workload range.
+    upper : numeric
+        Upper end of the workload range.
+    kwargs
+        Passed to :class:`AdaptiveSampler`.
+    Returns
+    -------
+    sampler : AdaptiveSampler
+        Finished sampler, the fit is available as `sampler.fit`.
+    """
+    sampler = AdaptiveSampler(lower, upper, **kwargs)
+    while not sampler.done:
+        workloads = sampler.pending()
+        P, Q = solve(workloads)
+        sampler.update(workloads, P, Q)
+    return sampler
+
+
+def adaptive_rows(solve, samplers):
+    r"""
+    Drive several samplers in common rounds.
+    Parameters
+    ----------
+    solve : callable
+        Called with a list of `(row, workload)` tuples, returns the lists P
+        and Q in MW.
+    samplers : list
+        One :class:`AdaptiveSampler` per row.
+    Returns
+    -------
+    samplers : list
+        The finished samplers.
+    """
+    while not all(sampler.done for sampler in samplers):
+        requests = [(i, wl) for i, sampler in enumerate(samplers)
+                    for wl in sampler.pending()]
+        P, Q = solve(requests)
+        rows = {}
+        for k, (i, wl) in enumerate(requests):
+            rows.setdefault(i, []).append(k)
+        for i, row in rows.items():
+            samplers[i].update([requests[k][1] for k in row],
+                               [P[k] for k in row], [Q[k] for k in row])
+    return samplers
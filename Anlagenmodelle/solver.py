@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+"""
+Solver driver for chained offdesign solves of TESPy networks.
+
+@author: Markus Brandt
+
+Along a sweep over workload or temperature, neighbouring operating points
+are close to each other. Starting the Newton solver from the converged state
+of the previous point instead of the design state saves iterations,
+especially far away from the design point.
+"""
+
+import json
+import os
+from time import perf_counter, time
+
+import pandas as pd
+
+
+def converged(nw, tol=1e-3):
+    """Check if the last solve of network `nw` converged."""
+    return (not nw.lin_dep and len(nw.res) > 0 and nw.res[-1] < tol and
+            nw.iter < nw.max_iter - 1)
+
+
+class WarmStartSolver:
+    r"""
+    Offdesign solver initialised from the previously converged state.
+    Parameters
+    ----------
+    nw : tespy.networks.network
+        Network to solve.
+    design_path : str
+        Path to the stored design state, also used for initialisation of the
+        first point and as fallback.
+    warm_start : bool
+        Chain the solves, otherwise every solve starts from the design state.
+    model : str
+        Name of the model in the log.
+    logpath : str
+        JSON lines file every solve is appended to, no file if None.
+    Note
+    ----
+    The points should be ordered along the sweep, so that the previous point
+    is the nearest one solved. If a warm started solve does not converge, the
+    point is solved again starting from the design state.
+
+    Every solve (design and offdesign) is recorded with wall time, Newton
+    iterations, final residual and convergence status in :attr:`log`. The
+    log file may be shared by the worker processes of a sweep, see
+    :func:`read_log`.
+    """
+
+    def __init__(self, nw, design_path, warm_start=True, model=None,
+                 logpath=None):
+        self.nw = nw
+        self.design_path = design_path
+        self.warm_start = warm_start
+        self.model = model
+        self.logpath = logpath
+        self.log = []
+        self._warm = False
+
+        if logpath is not None:
+            os.makedirs(os.path.dirname(os.path.abspath(logpath)),
+                        exist_ok=True)
+
+    def _solve(self, mode='offdesign', init_path=None):
+        start = perf_counter()
+        if mode == 'design':
+            self.nw.solve('design')
+        else:
+            self.nw.solve('offdesign', init_path=init_path,
+                          design_path=self.design_path)
+        return {'iterations': self.nw.iter + 1,
+                'time': perf_counter() - start,
+                'residual': float(self.nw.res[-1]) if len(self.nw.res)
+                else None,
+                'converged': bool(converged(self.nw))}
+
+    def _record(self, info):
+        self.log += [info]
+        if self.logpath is not None:
+            record = {'model': self.model, 'pid': os.getpid(),
+                      'timestamp': time(), **info}
+            with open(self.logpath, 'a') as f:
+                f.write(json.dumps(record, default=float) + '\n')
+
+    def design(self):
+        """Solve the design case, return the solver info."""
+        info = self._solve('design')
+        info['init'] = 'design'
+        info['mode'] = 'design'
+        self._warm = False
+        self._record(info)
+        return info
+
+    def solve(self, **point):
+        r"""
+        Solve the network at its current parametrisation.
+        Parameters
+        ----------
+        point : dict
+            Description of the operating point, only used for the log.
+        Returns
+        -------
+        info : dict
+            Point, initialisation (warm, design or fallback), iterations,
+            wall time, final residual and convergence status.
+        """
+        if self._warm:
+            info = self._solve(init_path=None)
+            info['init'] = 'warm'
+            if not info['converged']:
+                elapsed = info['time']
+                iterations = info['iterations']
+                info = self._solve(init_path=self.design_path)
+                info['init'] = 'fallback'
+                info['time'] += elapsed
+                info['iterations'] += iterations
+        else:
+            info = self._solve(init_path=self.design_path)
+            info['init'] = 'design'
+
+        self._warm = self.warm_start and info['converged']
+
+        info = {**point, **info, 'mode': 'offdesign'}
+        self._record(info)
+        return info
+
+    def report(self):
+        """Return the log of all offdesign solves as DataFrame."""
+        log = pd.DataFrame(self.log)
+        if log.empty:
+            return log
+        return log[log['mode'] == 'offdesign'].drop(
+            columns='mode').reset_index(drop=True)
+
+
+def read_log(logpath):
+    """Read a JSON lines solver log into a DataFrame."""
+    with open(logpath) as f:
+        return pd.DataFrame([json.loads(line) for line in f if line.strip()])
+
+
+def summary(log, n=5):
+    r"""
+    Summarise a solver log per model.
+    Parameters
+    ----------
+    log : pandas.core.frame.DataFrame
+        Solver log, e.g. from :func:`read_log` or
+        :meth:`WarmStartSolver.report`.
+    n : int
+        Number of slowest points listed per model.
+    Returns
+    -------
+    overview : pandas.core.frame.DataFrame
+        Number of solves, share converged, mean and maximum wall time and
+        iterations per model and mode.
+    slowest : pandas.core.frame.DataFrame
+        The `n` slowest solves of every model.
+    """
+    log = log.copy()
+    if 'model' not in log:
+        log['model'] = None
+    if 'mode' not in log:
+        log['mode'] = 'offdesign'
+    log['model'] = log['model'].fillna('')
+
+    overview = log.groupby(['model', 'mode']).agg(
+        solves=('time', 'size'), converged=('converged', 'mean'),
+        time_mean=('time', 'mean'), time_max=('time', 'max'),
+        iterations_mean=('iterations', 'mean'),
+        iterations_max=('iterations', 'max'))
+
+    slowest = (log.sort_values('time', ascending=False)
+               .groupby('model', sort=False).head(n)
+               .sort_values(['model', 'time'], ascending=[True, False])
+               .dropna(axis=1, how='all'))
+    return overview, slowest.reset_index(drop=True)
+
+
+def compare(cold, warm):
+    r"""
+    Compare iterations and wall time of a cold and a warm started sweep.
+    Parameters
+    ----------
+    cold : pandas.core.frame.DataFrame
+        Report of a sweep started from the design state for every point.
+    warm : pandas.core.frame.DataFrame
+        Report of the same sweep with warm start.
+    Returns
+    -------
+    comparison : pandas.core.frame.DataFrame
+        Iterations and wall time saved per point.
+    """
+    comparison = warm.drop(columns=['iterations', 'time', 'residual',
+                                    'converged'])
+    comparison['iterations_saved'] = cold['iterations'] - warm['iterations']
+    comparison['time_cold'] = cold['time']
+    comparison['time_warm'] = warm['time']
+    return comparison
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+Surrogate models of the plant offdesign behaviour.
+
+@author: Markus Brandt
+
+The offdesign space of a plant is sampled once on a regular grid, e.g.
+workload x feed flow temperature x source temperature. Afterwards, results
+for arbitrary operating points (e.g. every hour of a year) are obtained by
+multilinear interpolation instead of a TESPy solve.
+"""
+
+import itertools
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from scipy.interpolate import RegularGridInterpolator
+
+from sweep import parallel_sweep
+
+
+class Surrogate:
+    r"""
+    Gridded table of plant results with multilinear interpolation.
+    Parameters
+    ----------
+    axes : dict
+        Grid values of every operating point parameter (ascending).
+    values : dict
+        Result arrays with shape of the grid.
+    model : str
+        Fingerprint of the plant model the table was sampled from.
+    Note
+    ----
+    Grid points that did not converge are NaN, predictions depending on them
+    are NaN as well. Both are reported with a warning, as are predictions
+    outside the grid, which are extrapolated linearly.
+    """
+
+    def __init__(self, axes, values, model=None):
+        self.axes = {k: np.asarray(v, dtype=float) for k, v in axes.items()}
+        self.values = {k: np.asarray(v, dtype=float)
+                       for k, v in values.items()}
+        self.model = model
+
+        grid = tuple(self.axes.values())
+        self._interpolators = {
+            k: RegularGridInterpolator(grid, v, bounds_error=False,
+                                       fill_value=None)
+            for k, v in self.values.items()}
+
+    @classmethod
+    def sample(cls, plant, axes, outputs, processes=None, model=None):
+        r"""
+        Solve the plant at every grid point and build the surrogate.
+        Parameters
+        ----------
+        plant : type
+            Plant class (subclass of :class:`plant.Plant`), instantiated
+            once per worker process.
+        axes : dict
+            Grid values of every offdesign parameter of the plant.
+        outputs : list
+            Keys of the plant results stored in the table.
+        processes : int
+            Number of worker processes.
+        model : str
+            Fingerprint of the plant model.
+        Returns
+        -------
+        surrogate : Surrogate
+            Surrogate model, points not converged are NaN.
+        """
+        names = list(axes)
+        points = [dict(zip(names, values))
+                  for values in itertools.product(*axes.values())]
+
+        results = parallel_sweep(plant, plant.offdesign, points,
+                                 processes=processes)
+
+        shape = tuple(len(v) for v in axes.values())
+        values = {}
+        for key in outputs:
+            values[key] = np.array(
+                [result[key] if result['converged'] else np.nan
+                 for result in results]).reshape(shape)
+
+        surrogate = cls(axes, values, model=model)
+        failed = surrogate.failed()
+        if len(failed):
+            warnings.warn(
+                '{0} of {1} grid points did not converge:\n{2}'.format(
+                    len(failed), len(points), failed.to_string(index=False)),
+                RuntimeWarning)
+        return surrogate
+
+    def failed(self):
+        """Return the grid points with a NaN result as DataFrame."""
+        mask = np.any([np.isnan(v) for v in self.values.values()], axis=0)
+        grid = np.meshgrid(*self.axes.values(), indexing='ij')
+        return pd.DataFrame({k: v[mask] for k, v in zip(self.axes, grid)})
+
+    def predict(self, **point):
+        r"""
+        Interpolate the results for arbitrary operating points.
+        Parameters
+        ----------
+        point : dict
+            Arrays (or scalars) of every grid parameter, broadcast against
+            each other. Values outside the grid are extrapolated linearly
+            with a warning.
+        Returns
+        -------
+        results : dict
+            Interpolated results with the broadcast shape of the inputs.
+        """
+        inputs = np.broadcast_arrays(
+            *[np.asarray(point[k], dtype=float) for k in self.axes])
+        shape = inputs[0].shape
+        xi = np.stack([x.ravel() for x in inputs], axis=-1)
+
+        for k, x in zip(self.axes, inputs):
+            outside = (x < self.axes[k][0]) | (x > self.axes[k][-1])
+            if outside.any():
+                warnings.warn(
+                    '{0} of {1} values of {2} outside the grid [{3}, {4}] '
+                    'are extrapolated.'.format(
+                        outside.sum(), x.size, k, self.axes[k][0],
+                        self.axes[k][-1]), RuntimeWarning)
+
+        results = {k: interpolator(xi).reshape(shape)
+                   for k, interpolator in self._interpolators.items()}
+
+        missing = np.any([np.isnan(v) for v in results.values()], axis=0)
+        if missing.any():
+            warnings.warn(
+                '{0} of {1} predictions are NaN, they depend on grid points '
+                'that did not converge.'.format(missing.sum(), missing.size),
+                RuntimeWarning)
+        return results
+
+    def validate(self, plant, points):
+        r"""
+        Compare the surrogate against TESPy solves of held-out points.
+        Parameters
+        ----------
+        plant : Plant
+            Plant instance used for the reference solves.
+        points : list
+            Operating points not on the grid.
+        Returns
+        -------
+        errors : pandas.core.frame.DataFrame
+            Reference, prediction and relative error of every output.
+        """
+        reference = plant.characterise(points)
+        predicted = self.predict(
+            **{k: reference[k].values for k in self.axes})
+
+        errors = reference[list(self.axes)].copy()
+        for key, value in predicted.items():
+            errors[key] = reference[key]
+            errors[key + '_surrogate'] = value
+            errors[key + '_error'] = (value - reference[key]) / reference[key]
+
+        return errors
+
+    def save(self, file):
+        """Store the table as .npz file."""
+        np.savez(file, model=str(self.model),
+                 axes=list(self.axes), outputs=list(self.values),
+                 **{'axis_' + k: v for k, v in self.axes.items()},
+                 **{'value_' + k: v for k, v in self.values.items()})
+
+    @classmethod
+    def load(cls, file, model=None):
+        """Load a table, return None if it was built from another model."""
+        with np.load(file) as data:
+            if model is not None and str(data['model']) != model:
+                return None
+            axes = {str(k): data['axis_' + k] for k in data['axes']}
+            values = {str(k): data['value_' + k] for k in data['outputs']}
+            return cls(axes, values, model=str(data['model']))
+
+
+def errors_summary(errors):
+    """Return maximum and mean absolute relative error of every output."""
+    cols = [c for c in errors.columns if c.endswith('_error')]
+    return pd.DataFrame({'max': errors[cols].abs().max(),
+                         'mean': errors[cols].abs().mean()})
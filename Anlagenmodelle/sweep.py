@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+Parallel offdesign parameter sweeps of TESPy plant models.
+
+@author: Markus Brandt
+
+Every worker process builds its own network once and solves the operating
+points it is assigned to. A warm started plant initialises every offdesign
+solve from the point its worker solved before, which need not be the
+neighbouring point of the sweep. Points that should be chained, e.g. the
+workloads of a row, are therefore sent together with
+:func:`parallel_groups`. Up to the solver tolerance the results do not
+depend on the assignment: the first solve of a worker and every solve not
+converging from the previous point start from the stored design state.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import os
+
+
+_model = None
+
+
+def _init_worker(build):
+    global _model
+    _model = build()
+
+
+def _solve_worker(solve, point):
+    return solve(_model, **point)
+
+
+def _solve_group(solve, points):
+    return [solve(_model, **point) for point in points]
+
+
+def parallel_sweep(build, solve, points, processes=None, chunksize=1):
+    r"""
+    Solve a list of operating points on a pool of worker processes.
+    Parameters
+    ----------
+    build : callable
+        Function without arguments returning the model, called once per
+        worker. Must be importable (defined at module level).
+    solve : callable
+        Function called as `solve(model, **point)` for every point.
+    points : list
+        List of dicts with the keyword arguments of the operating points.
+    processes : int
+        Number of worker processes, defaults to the number of cores. With
+        one process the points are solved serially in the calling process.
+    chunksize : int
+        Number of points sent to a worker at once.
+    Returns
+    -------
+    results : list
+        Results of `solve` in the order of `points`.
+    """
+    if processes is None:
+        processes = os.cpu_count()
+
+    if processes == 1:
+        model = build()
+        return [solve(model, **point) for point in points]
+
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                             initargs=(build,)) as pool:
+        return list(pool.map(_solve_worker, [solve] * len(points), points,
+                             chunksize=chunksize))
+
+
+def parallel_groups(build, solve, groups, processes=None):
+    r"""
+    Solve groups of operating points, every group in order on one worker.
+    Parameters
+    ----------
+    build : callable
+        Function without arguments returning the model, called once per
+        worker. Must be importable (defined at module level).
+    solve : callable
+        Function called as `solve(model, **point)` for every point.
+    groups : list
+        List of lists of dicts with the keyword arguments of the operating
+        points.
+    processes : int
+        Number of worker processes, defaults to the number of cores. With
+        one process the groups are solved serially in the calling process.
+    Returns
+    -------
+    results : list
+        List of the results of `solve` of every group.
+    Note
+    ----
+    The points of a group are solved one after the other by the same model,
+    so a warm started solve begins at the previous point of its group.
+    """
+    if processes is None:
+        processes = os.cpu_count()
+
+    if processes == 1:
+        model = build()
+        return [[solve(model, **point) for point in points]
+                for points in groups]
+
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                             initargs=(build,)) as pool:
+        return list(pool.map(_solve_group, [solve] * len(groups), groups))
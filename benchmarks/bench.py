@@ -0,0 +1,400 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark suite of the preprocessing and plant model hot paths.
+
+@author: Markus Brandt
+
+Run from the repository root:
+
+    python benchmarks/bench.py                  # run all, store results
+    python benchmarks/bench.py -k radiation     # only matching benchmarks
+    python benchmarks/bench.py --compare        # compare with previous run
+
+All inputs are read from Eingangsdaten, nothing is downloaded. Results are
+appended to .cache/benchmarks/results.jsonl together with the git commit,
+so runs of different commits can be compared. Benchmarks of the TESPy
+plants are skipped if TESPy is not installed.
+"""
+
+import argparse
+import importlib.util
+from datetime import datetime as dt
+import json
+import os
+import os.path as path
+import platform
+import subprocess
+import sys
+import tempfile
+from timeit import repeat
+
+import numpy as np
+
+dirpath = path.abspath(path.join(__file__, "../.."))
+sys.path.append(path.join(dirpath, 'preprocessing'))
+sys.path.append(path.join(dirpath, 'Anlagenmodelle'))
+
+resultpath = path.join(dirpath, '.cache', 'benchmarks', 'results.jsonl')
+
+latitude = 54.7986
+longitude = 9.4327
+
+BENCHMARKS = []
+
+
+def benchmark(group, number=1, runs=5):
+    r"""
+    Register a benchmark.
+    Parameters
+    ----------
+    group : str
+        Group of the benchmark, e.g. 'preprocessing' or 'plants'.
+    number : int
+        Calls per timing run.
+    runs : int
+        Number of timing runs, the minimum and median are reported.
+    Note
+    ----
+    The decorated function does the setup and returns a callable to time
+    and a dict of metrics derived from one call (e.g. throughput), which
+    may also be a callable of the time per call.
+    """
+    def register(func):
+        BENCHMARKS.append({'name': func.__name__, 'group': group,
+                           'func': func, 'number': number, 'runs': runs})
+        return func
+    return register
+
+
+# %% inputs
+
+_inputs = {}
+
+
+def inputs():
+    """Full year of radiation, temperatures and collector data."""
+    if not _inputs:
+        import pandas as pd
+        from series_store import load_series
+
+        weather = load_series('solar_weather')
+        amb = load_series('ninja_weather', columns=['temperature'])
+        swfl = load_series('swfl')
+        collectors = pd.read_csv(
+            path.join(dirpath, 'Eingangsdaten', 'collector_data.csv'),
+            skipinitialspace=True)
+
+        _inputs.update({
+            'datetime': weather['utc_timestamp'].values,
+            'e_dir_hor': np.array(
+                weather['DEF0_radiation_direct_horizontal']),
+            'e_diff_hor': np.array(
+                weather['DEF0_radiation_diffuse_horizontal']),
+            'amb_temp': np.array(amb['temperature']),
+            'feed_temp': np.array(swfl['feed flow temperature'], float),
+            'return_temp': np.array(swfl['average return flow'], float),
+            'collector': collectors.iloc[0],
+            'weather': weather})
+        _inputs['e_g_hor'] = _inputs['e_dir_hor'] + _inputs['e_diff_hor']
+    return _inputs
+
+
+def _radiation_kwargs():
+    data = inputs()
+    return {'phi': latitude, 'lam': longitude, 'albedo': 0.2,
+            'datetime': data['datetime'], 'e_dir_hor': data['e_dir_hor'],
+            'e_diff_hor': data['e_diff_hor'], 'e_g_hor': data['e_g_hor']}
+
+
+# %% preprocessing
+
+@benchmark('preprocessing')
+def radiation_full_year():
+    from ratipl import calculate_radiation
+    kwargs = _radiation_kwargs()
+    hours = len(kwargs['datetime'])
+    return (lambda: calculate_radiation(gamma_e=37, alpha_e=0, **kwargs),
+            lambda t: {'hours_per_s': hours / t})
+
+
+@benchmark('preprocessing', number=10)
+def radiation_cached_sun():
+    from ratipl import calculate_radiation
+    from sun_cache import SunPositionCache
+    kwargs = _radiation_kwargs()
+    cache = SunPositionCache()
+    calculate_radiation(gamma_e=37, alpha_e=0, cache=cache, **kwargs)
+    hours = len(kwargs['datetime'])
+    return (lambda: calculate_radiation(gamma_e=37, alpha_e=0, cache=cache,
+                                        **kwargs),
+            lambda t: {'hours_per_s': hours / t})
+
+
+@benchmark('preprocessing')
+def radiation_substeps():
+    from ratipl import calculate_radiation
+    kwargs = _radiation_kwargs()
+    hours = len(kwargs['datetime'])
+    return (lambda: calculate_radiation(gamma_e=37, alpha_e=0, substeps=12,
+                                        **kwargs),
+            lambda t: {'hours_per_s': hours / t})
+
+
+@benchmark('preprocessing', runs=3)
+def radiation_orientations():
+    from ratipl import optimal_orientation
+    kwargs = _radiation_kwargs()
+    orientations = 19 * 19
+    return (lambda: optimal_orientation(**kwargs),
+            lambda t: {'orientations_per_s': orientations / t})
+
+
+def _cells_benchmark(engine, cells=100):
+    from radiation_kernel import radiation_cells
+    data = inputs()
+    rng = np.random.default_rng(0)
+    phi = rng.uniform(47, 55, cells)
+    lam = rng.uniform(6, 15, cells)
+    scale = rng.uniform(0.8, 1.2, (cells, 1))
+    e_dir_hor = data['e_dir_hor'] * scale
+    e_diff_hor = data['e_diff_hor'] * scale
+    radiation_cells(phi[:1], lam[:1], data['datetime'], e_dir_hor[:1],
+                    e_diff_hor[:1], e_dir_hor[:1] + e_diff_hor[:1],
+                    engine=engine)   # compile
+    values = cells * len(data['datetime'])
+    return (lambda: radiation_cells(
+        phi, lam, data['datetime'], e_dir_hor, e_diff_hor,
+        e_dir_hor + e_diff_hor, gamma_e=37, albedo=0.2, engine=engine),
+        lambda t: {'cell_hours_per_s': values / t})
+
+
+@benchmark('preprocessing', runs=3)
+def radiation_cells_numpy():
+    return _cells_benchmark('numpy')
+
+
+@benchmark('preprocessing', runs=3)
+def radiation_cells_numba():
+    import numba  # noqa: F401
+    return _cells_benchmark('numba')
+
+
+@benchmark('preprocessing', number=100)
+def collector_full_year():
+    from collector import collector_heat_yield
+    from ratipl import calculate_radiation
+    data = inputs()
+    radiation = calculate_radiation(gamma_e=37, alpha_e=0,
+                                    **_radiation_kwargs())['global']
+    hours = len(radiation)
+    return (lambda: collector_heat_yield(
+        radiation, data['feed_temp'], data['return_temp'], data['amb_temp'],
+        data['collector']), lambda t: {'hours_per_s': hours / t})
+
+
+@benchmark('preprocessing', number=100)
+def series_load():
+    from series_store import load_series
+    load_series('solar_weather')
+    return lambda: load_series('solar_weather'), {}
+
+
+@benchmark('preprocessing', number=100)
+def align_full_year():
+    from alignment import align, target_index, to_utc
+    data = inputs()
+    source = to_utc(data['weather']['utc_timestamp'])
+    target = target_index(2019)
+    return lambda: align(data['e_dir_hor'], source, target), {}
+
+
+# %% plants
+
+def _plant(script, cls, **kwargs):
+    """Import a plant class, return an instance with a temporary design."""
+    spec = importlib.util.spec_from_file_location(
+        cls.lower(), path.join(dirpath, 'Anlagenmodelle', script))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    modelpath = path.join(tempfile.mkdtemp(prefix='bench_'), cls)
+    return getattr(module, cls)(modelpath=modelpath, **kwargs)
+
+
+def _plant_benchmark(script, cls, point):
+    r"""
+    Design once, then time an offdesign solve at `point(plant)`.
+    Returns the solve and the metrics of the last solve: TESPy iterations
+    and design time.
+    """
+    plant = _plant(script, cls, warm_start=False)
+
+    design = repeat(plant.design, number=1, repeat=1)[0]
+    offdesign = point(plant)
+
+    def solve():
+        return plant.offdesign(**offdesign)
+
+    def metrics(t):
+        info = plant.solver.log[-1]
+        return {'iterations': info['iterations'],
+                'converged': bool(info['converged']), 'design_s': design}
+
+    return solve, metrics
+
+
+@benchmark('plants', runs=3)
+def bpt_offdesign():
+    return _plant_benchmark('bpt/bpt.py', 'BPT',
+                            lambda p: {'P': 0.8 * p.power.P.val})
+
+
+@benchmark('plants', runs=3)
+def ccet_offdesign():
+    return _plant_benchmark('ccet/ccet.py', 'CCET',
+                            lambda p: {'m_fuel': 0.8 * p.m_fuel,
+                                       'Q_dh': p.Q_dh})
+
+
+@benchmark('plants', runs=3)
+def heat_pump_offdesign():
+    return _plant_benchmark('heatpump/heat_pump.py', 'HeatPump',
+                            lambda p: {'P': 0.8 * p.power.P.val, 'T_VL': 80,
+                                       'T_water_amb': 10})
+
+
+@benchmark('plants', runs=3)
+def water_electrolyzer_offdesign():
+    return _plant_benchmark('electrolyzer/water_electrolyzer.py',
+                            'WaterElectrolyzer',
+                            lambda p: {'P': 0.6 * p.el.P.val})
+
+
+# %% runner
+
+def run(pattern=None):
+    r"""
+    Run the registered benchmarks.
+    Parameters
+    ----------
+    pattern : str
+        Only benchmarks containing `pattern` in their name or group.
+    Returns
+    -------
+    results : list
+        One dict per benchmark with time per call (min and median) in
+        seconds and its metrics, or the reason it was skipped.
+    """
+    results = []
+    for bench in BENCHMARKS:
+        if pattern and pattern not in bench['name'] + bench['group']:
+            continue
+        result = {'name': bench['name'], 'group': bench['group']}
+        try:
+            func, metrics = bench['func']()
+        except ImportError as e:
+            result['skipped'] = str(e)
+            results += [result]
+            print('{0:32} skipped ({1})'.format(bench['name'], e))
+            continue
+
+        func()   # warm up
+        times = np.array(repeat(func, number=bench['number'],
+                                repeat=bench['runs'])) / bench['number']
+        result.update({'min': times.min(), 'median': np.median(times),
+                       'number': bench['number'], 'runs': bench['runs']})
+        if callable(metrics):
+            metrics = metrics(times.min())
+        result.update(metrics)
+        results += [result]
+        print('{0:32} {1:10.3f} ms  {2}'.format(
+            bench['name'], result['min'] * 1e3,
+            ', '.join('{0}={1:.4g}'.format(k, v) if isinstance(v, float)
+                      else '{0}={1}'.format(k, v)
+                      for k, v in metrics.items())))
+    return results
+
+
+def _commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=dirpath,
+            capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def save(results):
+    """Append a run to the results file."""
+    os.makedirs(path.dirname(resultpath), exist_ok=True)
+    run = {'commit': _commit(), 'time': dt.now().isoformat(timespec='seconds'),
+           'python': platform.python_version(), 'machine': platform.node(),
+           'results': results}
+    with open(resultpath, 'a') as f:
+        f.write(json.dumps(run) + '\n')
+
+
+def load_runs():
+    """Return all stored runs, oldest first."""
+    if not path.isfile(resultpath):
+        return []
+    with open(resultpath) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def compare(results, reference, threshold=0.1):
+    r"""
+    Print the change of the minimum time per call against a reference run.
+    Parameters
+    ----------
+    results : list
+        Results of :func:`run`.
+    reference : dict
+        Stored run, see :func:`load_runs`.
+    threshold : numeric
+        Relative change reported as regression or improvement.
+    Returns
+    -------
+    regressions : list
+        Names of the benchmarks slower by more than `threshold`.
+    """
+    previous = {r['name']: r for r in reference['results'] if 'min' in r}
+    regressions = []
+    print('\ncompared with {0} ({1})'.format(reference['commit'],
+                                            reference['time']))
+    for result in results:
+        if 'min' not in result or result['name'] not in previous:
+            continue
+        ratio = result['min'] / previous[result['name']]['min']
+        flag = ''
+        if ratio > 1 + threshold:
+            flag = 'slower'
+            regressions += [result['name']]
+        elif ratio < 1 - threshold:
+            flag = 'faster'
+        print('{0:32} {1:8.2f}x  {2}'.format(result['name'], ratio, flag))
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('-k', dest='pattern', help='run matching benchmarks')
+    parser.add_argument('--compare', nargs='?', const='previous',
+                        help='compare with the previous run or a commit')
+    parser.add_argument('--threshold', type=float, default=0.1)
+    parser.add_argument('--no-save', action='store_true')
+    args = parser.parse_args()
+
+    runs = load_runs()
+    if args.compare and args.compare != 'previous':
+        runs = [r for r in runs if r['commit'] == args.compare]
+        if not runs:
+            sys.exit('no stored run for commit {0}'.format(args.compare))
+
+    results = run(args.pattern)
+    if not args.no_save:
+        save(results)
+
+    if args.compare and runs:
+        reference = runs[-1]
+        if compare(results, reference, args.threshold):
+            sys.exit(1)
@@ -0,0 +1,209 @@
+"""Alignment of input time series of different years onto a common calendar."""
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from ratipl import _time_difference
+
+
+HOURS = 8760
+
+_mappings = {}
+
+
+def target_index(year, leap_day=False):
+    r"""
+    Hourly UTC timestamps of a target year.
+    Parameters
+    ----------
+    year : int
+        Target year.
+    leap_day : bool
+        Keep the 29th of February of leap years. The input data is given
+        without it, so it is dropped by default.
+    Returns
+    -------
+    index : pandas.core.indexes.datetimes.DatetimeIndex
+        Timestamps in UTC.
+    """
+    index = pd.date_range(str(year), str(year + 1), freq='h', tz='UTC',
+                          inclusive='left')
+    if not leap_day:
+        index = index[~((index.month == 2) & (index.day == 29))]
+    return index
+
+
+def to_utc(datetime, tz=None):
+    r"""
+    Convert timestamps to UTC.
+    Parameters
+    ----------
+    datetime : array-like
+        Timestamps, tz-aware or naive.
+    tz : str
+        Time zone of naive timestamps (local wall clock), UTC if None.
+        Repeated hours at the end of daylight saving time are assigned in
+        the order they occur, hours skipped at its start take the offset
+        before the change, see :func:`ratipl._time_difference`.
+    Returns
+    -------
+    index : pandas.core.indexes.datetimes.DatetimeIndex
+        Timestamps in UTC.
+    """
+    index = pd.DatetimeIndex(datetime)
+    if index.tz is None:
+        if tz is None:
+            return index.tz_localize('UTC')
+        local, td = _time_difference(index, tz)
+        offset = np.round(np.nan_to_num(td) * 3600).astype('timedelta64[s]')
+        return pd.DatetimeIndex(local - offset).tz_localize('UTC')
+    return index.tz_convert('UTC')
+
+
+def from_local_time(time, local_time):
+    r"""
+    Get UTC timestamps from a pair of UTC and local columns (ninja data).
+    Parameters
+    ----------
+    time : array-like
+        Naive timestamps in UTC.
+    local_time : array-like
+        Naive local timestamps of the same hours.
+    Returns
+    -------
+    index : pandas.core.indexes.datetimes.DatetimeIndex
+        Timestamps in UTC.
+    offset : numpy.ndarray
+        Offset of the local time against UTC in hours of every row.
+    """
+    time = pd.DatetimeIndex(time)
+    local_time = pd.DatetimeIndex(local_time)
+    offset = (local_time - time).total_seconds().values / 3600
+    return time.tz_localize('UTC'), offset
+
+
+def hour_of_year(index, frame='UTC'):
+    r"""
+    Hour of year in a calendar without leap days.
+    Parameters
+    ----------
+    index : pandas.core.indexes.datetimes.DatetimeIndex
+        Timestamps in UTC.
+    frame : str
+        Time zone in which the hours are counted, e.g. 'Europe/Berlin' to
+        align series by local wall clock.
+    Returns
+    -------
+    hour : numpy.ndarray
+        Hour from 0 to 8759, the 29th of February counts as 28th, -1 for
+        missing timestamps.
+    """
+    index = index.tz_convert(frame)
+    day = index.dayofyear.values - 1
+    leap = index.is_leap_year & (index.dayofyear >= 60)
+    day = day - leap
+    hour = day * 24 + index.hour.values
+    return np.where(index.isna(), -1, hour).astype(int)
+
+
+def _key(source, target, frame):
+    digest = hashlib.sha1(str(frame).encode())
+    for index in (source, target):
+        digest.update(index.asi8.tobytes())
+        digest.update(b'|')
+    return digest.hexdigest()
+
+
+def mapping(source, target, frame='UTC'):
+    r"""
+    Position of the source row for every target timestamp.
+    Parameters
+    ----------
+    source : pandas.core.indexes.datetimes.DatetimeIndex
+        Timestamps of the source series in UTC, any year.
+    target : pandas.core.indexes.datetimes.DatetimeIndex
+        Target timestamps in UTC, e.g. from :func:`target_index`.
+    frame : str
+        Time zone in which the hours of different years are matched.
+    Returns
+    -------
+    positions : numpy.ndarray
+        Source row of every target timestamp, -1 if the source has no
+        matching hour. The mapping is cached.
+    Note
+    ----
+    Hours are matched by month, day and hour in `frame`. If a source hour
+    occurs twice (repeated hour at the end of daylight saving time in a
+    local frame, 29th of February), the first occurrence is used.
+    """
+    key = _key(source, target, frame)
+    if key in _mappings:
+        return _mappings[key]
+
+    hour = hour_of_year(source, frame)
+    valid = np.flatnonzero(hour >= 0)[::-1]
+    lookup = np.full(HOURS, -1)
+    lookup[hour[valid]] = valid
+
+    positions = lookup[hour_of_year(target, frame)]
+    positions.setflags(write=False)
+    _mappings[key] = positions
+    return positions
+
+
+def coverage(source, target, frame='UTC'):
+    """Return the number of target hours missing and source hours unused."""
+    positions = mapping(source, target, frame)
+    return {'missing': int(np.sum(positions < 0)),
+            'unused': len(source) - len(np.unique(positions[positions >= 0]))}
+
+
+def align(values, source, target, frame='UTC', fill=True):
+    r"""
+    Reindex a series onto the target calendar.
+    Parameters
+    ----------
+    values : array-like/pandas.core.frame.DataFrame
+        Values of the source rows, arrays or DataFrame with rows along the
+        first axis.
+    source : pandas.core.indexes.datetimes.DatetimeIndex
+        Timestamps of the source series in UTC.
+    target : pandas.core.indexes.datetimes.DatetimeIndex
+        Target timestamps in UTC.
+    frame : str
+        Time zone in which the hours of different years are matched.
+    fill : bool
+        Fill target hours without a source hour with the previous hour
+        (the next one at the start), otherwise NaN.
+    Returns
+    -------
+    aligned : numpy.ndarray/pandas.core.frame.DataFrame
+        Values on the target calendar, a DataFrame is indexed by `target`.
+    """
+    if len(values) != len(source):
+        raise ValueError('Values and timestamps differ in length: {0} and '
+                         '{1}.'.format(len(values), len(source)))
+
+    positions = mapping(source, target, frame)
+    missing = positions < 0
+    if fill and missing.any():
+        if missing.all():
+            raise ValueError('The source series covers no target hour.')
+        idx = np.where(missing, 0, np.arange(len(positions)))
+        idx = np.maximum.accumulate(idx)
+        first = np.argmax(~missing)
+        idx[:first] = first
+        positions = positions[idx]
+        missing = np.zeros(len(positions), dtype=bool)
+
+    if isinstance(values, pd.DataFrame):
+        aligned = values.iloc[np.where(missing, 0, positions)]
+        aligned.index = target
+        return aligned.mask(np.broadcast_to(missing[:, None], aligned.shape))
+
+    aligned = np.asarray(values)[np.where(missing, 0, positions)]
+    if missing.any():
+        aligned = aligned.astype(float)
+        aligned[missing] = np.nan
+    return aligned
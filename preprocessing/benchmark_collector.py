@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the vectorized collector yield against the former loop.
+
+@author: Markus Brandt
+"""
+
+import os.path as path
+from timeit import repeat
+
+import numpy as np
+import pandas as pd
+
+from collector import collector_heat_yield
+from ratipl import calculate_radiation
+
+
+# %% reference implementation (element wise loop, as before)
+
+def collector_heat_yield_reference(radiation, feed_temp, return_temp,
+                                   amb_temp, eta_opt, alpha1, alpha2):
+    col_temp = (feed_temp - return_temp) / 2
+
+    eta = (eta_opt - alpha1 * (col_temp - amb_temp) / radiation -
+           alpha2 * (col_temp - amb_temp) ** 2 / radiation)
+
+    i = 0
+    for x in eta:
+        if x == '-inf':
+            eta[i] = 0
+        elif x < 0:
+            eta[i] = 0
+        i += 1
+
+    return eta, eta * radiation
+
+
+# %% read data
+
+dirpath = path.abspath(path.join(__file__, "../.."))
+readpath = path.join(dirpath, 'Eingangsdaten', 'solar_weather_data_2012.csv')
+weather_data = pd.read_csv(readpath, sep=",")
+weather_data['utc_timestamp'] = pd.to_datetime(weather_data['utc_timestamp'])
+e_dir_hor = weather_data['DEF0_radiation_direct_horizontal'].values
+e_diff_hor = weather_data['DEF0_radiation_diffuse_horizontal'].values
+
+readpath = path.join(dirpath, 'Eingangsdaten',
+                     'ninja_weather_54.7986_9.4327_uncorrected2019.csv')
+amb_temp = np.array(pd.read_csv(readpath, sep=",")['temperature'])
+
+readpath = path.join(dirpath, 'Eingangsdaten', 'swfl_data.csv')
+swfl_data = pd.read_csv(readpath, sep=";")
+feed_temp = np.array(swfl_data['feed flow temperature'])
+return_temp = np.array(swfl_data['average return flow'])
+
+readpath = path.join(dirpath, 'Eingangsdaten', 'collector_data.csv')
+collector_data = pd.read_csv(readpath, sep=",", skipinitialspace=True)
+collector = collector_data.iloc[0]
+
+radiation = calculate_radiation(phi=54.7986, lam=9.4327, gamma_e=37,
+                                alpha_e=0, albedo=0.2,
+                                datetime=weather_data['utc_timestamp'].values,
+                                e_dir_hor=e_dir_hor, e_diff_hor=e_diff_hor,
+                                e_g_hor=e_dir_hor + e_diff_hor)['global']
+
+
+# %% agreement
+
+with np.errstate(all='ignore'):
+    eta_ref, q_ref = collector_heat_yield_reference(
+        radiation.copy(), feed_temp, return_temp, amb_temp,
+        collector['eta_opt'], collector['alpha1'], collector['alpha2'])
+eta, q_solar = collector_heat_yield(radiation, feed_temp, return_temp,
+                                    amb_temp, collector)
+
+valid = np.isfinite(q_ref.values)
+print('hours with NaN/inf in the loop version: {0}'.format((~valid).sum()))
+print('identical on the remaining hours: {0}'.format(
+    np.array_equal(q_ref.values[valid], q_solar[valid])))
+
+
+# %% timing
+
+number = 5
+with np.errstate(all='ignore'):
+    t_ref = min(repeat(lambda: collector_heat_yield_reference(
+        radiation.copy(), feed_temp, return_temp, amb_temp,
+        collector['eta_opt'], collector['alpha1'], collector['alpha2']),
+        number=number, repeat=3)) / number
+t_new = min(repeat(lambda: collector_heat_yield(
+    radiation, feed_temp, return_temp, amb_temp, collector),
+    number=number, repeat=3)) / number
+t_all = min(repeat(lambda: collector_heat_yield(
+    radiation, feed_temp, return_temp, amb_temp, collector_data),
+    number=number, repeat=3)) / number
+
+print('python loop:          {0:.2f} ms'.format(t_ref * 1e3))
+print('vectorized:           {0:.2f} ms'.format(t_new * 1e3))
+print('vectorized, {0} types: {1:.2f} ms'.format(len(collector_data),
+                                                t_all * 1e3))
+print('speedup:              {0:.1f}x'.format(t_ref / t_new))
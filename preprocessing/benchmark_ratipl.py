@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the NumPy radiation engine against the former pandas version.
+
+@author: Markus Brandt
+"""
+
+import os.path as path
+from timeit import repeat
+
+import numpy as np
+import pandas as pd
+
+from ratipl import calculate_radiation
+
+
+# %% reference implementation (pandas based, as before the NumPy engine)
+
+def calculate_radiation_reference(phi=0, lam=0, timezone='UTC', gamma_e=0,
+                                  alpha_e=0, albedo=0, datetime=np.nan,
+                                  e_dir_hor=np.nan, e_diff_hor=np.nan,
+                                  e_g_hor=np.nan):
+    phi = phi * np.pi / 180
+    lam = lam * np.pi / 180
+    gamma_e = gamma_e * np.pi / 180
+    alpha_e = alpha_e * np.pi / 180
+
+    e = pd.DataFrame(datetime, columns=['date'])
+
+    if e['date'].dt.tz is None:
+        e['date_timezone'] = e['date'].dt.tz_localize(
+                timezone, nonexistent='NaT', ambiguous='NaT')
+    else:
+        e['date_timezone'] = e['date']
+
+    e['date_timezone_utc'] = e['date_timezone'].dt.tz_convert('UTC')
+    e['td'] = (e['date_timezone'].dt.hour - e['date_timezone_utc'].dt.hour)
+
+    e.loc[e['td'] > 12, 'td'] = 24 - e['td']
+    e.loc[e['td'] < -12, 'td'] = 24 + e['td']
+
+    e['doy'] = e['date'].dt.dayofyear
+
+    leap_year = e['date'].dt.is_leap_year
+    e['diy'] = np.nan
+    e.loc[leap_year == True, 'diy'] = 366
+    e.loc[leap_year == False, 'diy'] = 365
+
+    j = 360 * e['doy'] / e['diy']
+    delta = np.pi / 180 * (
+            0.3948 - 23.2559 * np.cos((j + 9.1) * np.pi / 180) -
+            0.3915 * np.cos((2 * j + 5.4) * np.pi / 180) -
+            0.1764 * np.cos((3 * j + 26) * np.pi / 180)
+            )
+
+    zgl = (0.0066 + 7.3525 * np.cos((j + 85.9) * np.pi / 180) +
+           9.9359 * np.cos((2 * j + 108.9) * np.pi / 180) +
+           0.3387 * np.cos((3 * j + 105.2) * np.pi / 180))
+
+    lz = e['date'].dt.hour + e['date'].dt.minute / 60
+    moz = lz - e['td'] + 4 * lam * 180 / np.pi / 60
+
+    e['woz'] = moz + zgl / 60
+    omega = (12 - e['woz']) * 15 * np.pi / 180
+
+    gamma_s = np.arcsin(np.cos(omega) * np.cos(phi) * np.cos(delta) +
+                        np.sin(phi) * np.sin(delta))
+
+    e['alpha_s'] = np.pi
+
+    expr = np.arccos((np.sin(gamma_s) * np.sin(phi) - np.sin(delta)) /
+                     (np.cos(gamma_s) * np.cos(phi)))
+
+    e.loc[e['woz'] <= 12, 'alpha_s'] -= expr
+    e.loc[e['woz'] > 12, 'alpha_s'] += expr
+
+    theta_tilt = np.arccos(
+            -np.cos(gamma_s) * np.sin(gamma_e) *
+            np.cos(e['alpha_s'] - alpha_e) +
+            np.sin(gamma_s) * np.cos(gamma_e)
+            )
+
+    K = np.cos(theta_tilt) / np.sin(gamma_s)
+
+    limit = 10
+    K[K > limit] = limit
+
+    e['dir'] = e_dir_hor * K
+
+    e.loc[e['dir'] < 0, 'dir'] = 0
+
+    F = 1 - (e_diff_hor / e_g_hor) ** 2
+    e['diff'] = (e_diff_hor * 0.5 * (1 + np.cos(gamma_e)) *
+                 (1 + F * np.sin(gamma_e / 2) ** 3) *
+                 (1 + F * np.cos(theta_tilt) ** 2 * np.cos(gamma_s) ** 3))
+
+    e.loc[e['diff'].isna(), 'diff'] = 0
+
+    e['refl'] = e_g_hor * albedo * 0.5 * (1 - np.cos(gamma_e))
+
+    e['global'] = e['dir'] + e['diff'] + e['refl']
+
+    return e[['date', 'global', 'dir', 'diff', 'refl']]
+
+
+# %% read data
+
+dirpath = path.abspath(path.join(__file__, "../.."))
+readpath = path.join(dirpath, 'Eingangsdaten', 'solar_weather_data_2012.csv')
+weather_data = pd.read_csv(readpath, sep=",")
+weather_data['utc_timestamp'] = pd.to_datetime(weather_data['utc_timestamp'])
+e_dir_hor = weather_data['DEF0_radiation_direct_horizontal'].values
+e_diff_hor = weather_data['DEF0_radiation_diffuse_horizontal'].values
+
+kwargs = {'phi': 54.7986, 'lam': 9.4327, 'gamma_e': 37, 'alpha_e': 0,
+          'albedo': 0.2, 'datetime': weather_data['utc_timestamp'].values,
+          'e_dir_hor': e_dir_hor, 'e_diff_hor': e_diff_hor,
+          'e_g_hor': e_dir_hor + e_diff_hor}
+
+
+# %% agreement
+
+with np.errstate(all='ignore'):
+    reference = calculate_radiation_reference(**kwargs)
+radiation = calculate_radiation(**kwargs)
+
+for key in ['global', 'dir', 'diff', 'refl']:
+    identical = np.array_equal(reference[key].values, radiation[key].values,
+                               equal_nan=True)
+    print('{0}: bitwise identical: {1}'.format(key, identical))
+
+
+# %% timing
+
+number = 20
+with np.errstate(all='ignore'):
+    t_ref = min(repeat(lambda: calculate_radiation_reference(**kwargs),
+                       number=number, repeat=5)) / number
+t_new = min(repeat(lambda: calculate_radiation(**kwargs),
+                   number=number, repeat=5)) / number
+
+print('pandas reference: {0:.2f} ms'.format(t_ref * 1e3))
+print('numpy engine:     {0:.2f} ms'.format(t_new * 1e3))
+print('speedup:          {0:.1f}x'.format(t_ref / t_new))
@@ -0,0 +1,72 @@
+"""Heat yield of solar thermal collectors."""
+import numpy as np
+import pandas as pd
+
+
+def collector_heat_yield(radiation, feed_temp, return_temp, amb_temp,
+                         collector_params):
+    r"""
+    Calculate collector efficiency and solar heat yield.
+    Parameters
+    ----------
+    radiation : np.ndarray/pandas.core.series.Series
+        Global radiation on the collector plane.
+    feed_temp : np.ndarray/pandas.core.series.Series
+        Feed flow temperature.
+    return_temp : np.ndarray/pandas.core.series.Series
+        Return flow temperature.
+    amb_temp : np.ndarray/pandas.core.series.Series
+        Ambient temperature.
+    collector_params : dict/pandas.core.series.Series/pandas.core.frame.DataFrame
+        Collector parameters eta_opt, alpha1 and alpha2. A DataFrame with one
+        row per collector type (e.g. collector_data.csv) evaluates all types
+        at once.
+    Returns
+    -------
+    eta : np.ndarray
+        Collector efficiency, shape (timesteps) for a single collector,
+        (collectors, timesteps) for a DataFrame of collectors.
+    q_solar : np.ndarray
+        Solar heat yield in units of `radiation`, same shape as `eta`.
+    Note
+    ----
+    Hours without radiation (and hours with negative efficiency) yield an
+    efficiency and heat of zero.
+    """
+    radiation = np.asarray(radiation, dtype=float)
+    feed_temp = np.asarray(feed_temp, dtype=float)
+    return_temp = np.asarray(return_temp, dtype=float)
+    amb_temp = np.asarray(amb_temp, dtype=float)
+
+    timesteps = len(radiation)
+    if (len(feed_temp) != timesteps or
+            len(return_temp) != timesteps or
+            len(amb_temp) != timesteps):
+        msg = ('The number of elements for all of the input series '
+               '(radiation, feed_temp, return_temp, amb_temp) must be '
+               'identical.')
+        raise ValueError(msg)
+
+    if isinstance(collector_params, pd.DataFrame):
+        collector_params = collector_params.rename(columns=str.strip)
+        shape = (-1, 1)
+    else:
+        shape = ()
+
+    eta_opt = np.reshape(np.asarray(collector_params['eta_opt'], float), shape)
+    alpha1 = np.reshape(np.asarray(collector_params['alpha1'], float), shape)
+    alpha2 = np.reshape(np.asarray(collector_params['alpha2'], float), shape)
+
+    col_temp = (feed_temp - return_temp) / 2
+    dT = col_temp - amb_temp
+
+    sun = radiation > 0
+    # avoid division by zero, these hours are masked afterwards
+    g = np.where(sun, radiation, 1)
+
+    eta = eta_opt - alpha1 * dT / g - alpha2 * dT ** 2 / g
+    eta = np.where(sun & (eta > 0), eta, 0)
+
+    q_solar = eta * np.where(sun, radiation, 0)
+
+    return eta, q_solar
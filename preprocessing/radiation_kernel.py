@@ -0,0 +1,265 @@
+"""Radiation on tilted planes of many sites, optionally compiled with numba."""
+import numpy as np
+
+from stage_profiling import stage
+from ratipl import (_calendar, _declination, _sun_angles, _time_difference,
+                    radiation_on_tilted_plane)
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+    prange = range
+
+
+NUMBA = njit is not None
+
+ENGINES = ['numba', 'numpy']
+
+COMPONENTS = ['global', 'dir', 'diff', 'refl']
+
+
+def _kernel(phi, lam, hour, sin_delta, cos_delta, zgl, e_dir_hor,
+            e_diff_hor, e_g_hor, gamma_e, alpha_e, albedo, limit, out):
+    r"""
+    Radiation on tilted planes of all cells and timesteps in one pass.
+
+    Cells are processed in parallel (`prange`), every timestep is evaluated
+    without intermediate arrays. `hour` is the local time in hours minus
+    the difference to UTC, the angles are in rad. The global, direct,
+    diffuse and reflected radiation are written to `out` of shape
+    (4, cells, timesteps). Same formulas as :func:`ratipl.sun_position`
+    and :func:`ratipl.radiation_on_tilted_plane`.
+    """
+    for c in prange(e_dir_hor.shape[0]):
+        sin_phi = np.sin(phi[c])
+        cos_phi = np.cos(phi[c])
+        sin_e = np.sin(gamma_e[c])
+        cos_e = np.cos(gamma_e[c])
+        diff_sky = 0.5 * (1 + cos_e)
+        diff_horizon = np.sin(gamma_e[c] / 2) ** 3
+        refl = albedo[c] * 0.5 * (1 - cos_e)
+        moz_lam = 4 * lam[c] * 180 / np.pi / 60
+
+        for t in range(e_dir_hor.shape[1]):
+            # sun position
+            woz = hour[t] + moz_lam + zgl[t] / 60
+            omega = (12 - woz) * 15 * np.pi / 180
+            gamma_s = np.arcsin(np.cos(omega) * cos_phi * cos_delta[t] +
+                                sin_phi * sin_delta[t])
+            sin_s = np.sin(gamma_s)
+            cos_s = np.cos(gamma_s)
+            expr = np.arccos((sin_s * sin_phi - sin_delta[t]) /
+                             (cos_s * cos_phi))
+            if woz <= 12:
+                alpha_s = np.pi - expr
+            elif woz > 12:
+                alpha_s = np.pi + expr
+            else:
+                alpha_s = np.pi
+
+            # angle of incidence
+            cos_theta = np.cos(np.arccos(
+                -cos_s * sin_e * np.cos(alpha_s - alpha_e[c]) +
+                sin_s * cos_e))
+
+            # direct radiation
+            K = cos_theta / sin_s
+            if K > limit:
+                K = limit
+            e_dir = e_dir_hor[c, t] * K
+            if e_dir < 0:
+                e_dir = 0.
+
+            # diffuse radiation
+            F = 1 - (e_diff_hor[c, t] / e_g_hor[c, t]) ** 2
+            e_diff = (e_diff_hor[c, t] * diff_sky * (1 + F * diff_horizon) *
+                      (1 + F * cos_theta ** 2 * cos_s ** 3))
+            if np.isnan(e_diff):
+                e_diff = 0.
+
+            # reflection from ground
+            e_refl = e_g_hor[c, t] * refl
+
+            out[0, c, t] = e_dir + e_diff + e_refl
+            out[1, c, t] = e_dir
+            out[2, c, t] = e_diff
+            out[3, c, t] = e_refl
+
+
+if NUMBA:
+    _compiled = njit(parallel=True, error_model='numpy', cache=True)(_kernel)
+else:
+    _compiled = None
+
+
+def _time_terms(datetime, timezone):
+    """Time dependent terms of the sun position shared by all sites."""
+    with stage('timezone'):
+        local, td = _time_difference(datetime, timezone)
+
+    with stage('calendar'):
+        j, lz = _calendar(local)
+        delta, zgl = _declination(j)
+
+    return {'hour': lz - td, 'delta': delta, 'zgl': zgl,
+            'sin_delta': np.sin(delta), 'cos_delta': np.cos(delta)}
+
+
+def _site_values(value, sites, name):
+    """Broadcast a scalar or one value per site to a float array."""
+    value = np.asarray(value, dtype=float)
+    if value.ndim and value.shape != (sites,):
+        raise ValueError('{0} must be a scalar or have one value per site, '
+                         'not shape {1}.'.format(name, value.shape))
+    return np.ascontiguousarray(np.broadcast_to(value, sites))
+
+
+def _site_series(e, sites, timesteps, name):
+    """Check a horizontal radiation input of shape (sites, timesteps)."""
+    if np.ndim(e) == 1:
+        e = np.asarray(e)[None, :]
+    if np.shape(e)[1:] != (timesteps,) or np.shape(e)[0] not in (1, sites):
+        raise ValueError('{0} must have shape ({1}, {2}) or ({2},), not '
+                         '{3}.'.format(name, sites, timesteps, np.shape(e)))
+    return e
+
+
+def _evaluate(terms, phi, lam, e_dir_hor, e_diff_hor, e_g_hor, gamma_e,
+              alpha_e, albedo, engine):
+    """Radiation of a chunk of sites as array (4, sites, timesteps)."""
+    sites = len(phi)
+    timesteps = len(terms['hour'])
+    e_dir_hor, e_diff_hor, e_g_hor = (
+        np.ascontiguousarray(np.broadcast_to(e, (sites, timesteps)),
+                             dtype=float)
+        for e in (e_dir_hor, e_diff_hor, e_g_hor))
+
+    if engine == 'numpy':
+        sun = _sun_angles(phi[:, None], lam[:, None], terms['hour'],
+                          terms['delta'], terms['zgl'])
+        e = radiation_on_tilted_plane(
+            sun, gamma_e=gamma_e[:, None], alpha_e=alpha_e[:, None],
+            albedo=albedo[:, None], e_dir_hor=e_dir_hor,
+            e_diff_hor=e_diff_hor, e_g_hor=e_g_hor)
+        return np.stack([np.broadcast_to(e[key], (sites, timesteps))
+                         for key in COMPONENTS])
+
+    out = np.empty((4, sites, timesteps))
+    _compiled(phi, lam, terms['hour'], terms['sin_delta'],
+              terms['cos_delta'], terms['zgl'], e_dir_hor, e_diff_hor,
+              e_g_hor, gamma_e * np.pi / 180, alpha_e * np.pi / 180, albedo,
+              10., out)
+    return out
+
+
+def calculate_radiation_sites(phi=0, lam=0, timezone='UTC', gamma_e=0,
+                              alpha_e=0, albedo=0, datetime=np.nan,
+                              e_dir_hor=np.nan, e_diff_hor=np.nan,
+                              e_g_hor=np.nan, chunksize=128, engine=None,
+                              out=None):
+    r"""
+    Calculate radiation on tilted planes of many sites with common timestamps.
+    Parameters
+    ----------
+    phi : array-like
+        Latitude of every site.
+    lam : array-like
+        Longitude of every site.
+    timezone : str
+        Name of the time zone of naive timestamps.
+    gamma_e : numeric/array-like
+        Angle of inclination, scalar or one per site.
+    alpha_e : numeric/array-like
+        South exposure, scalar or one per site.
+    albedo : numeric/array-like
+        Reflectivity of the ground, scalar or one per site.
+    datetime : np.ndarray/pandas.core.series.Series
+        Timestamps of all sites, see :func:`ratipl.calculate_radiation`.
+    e_dir_hor : array-like
+        Direct radiation on horizontal plane of shape (sites, timesteps), or
+        (timesteps,) if equal for all sites. May be memory mapped, only one
+        chunk is read at a time.
+    e_diff_hor : array-like
+        Diffuse radiation on horizontal plane, same shape.
+    e_g_hor : array-like
+        Global radiation on horizontal plane, same shape.
+    chunksize : int
+        Number of sites evaluated at once, limits the memory of the
+        intermediate arrays.
+    engine : str
+        'numba' for the compiled kernel, 'numpy' for the vectorized model.
+        Defaults to 'numba' if numba is installed.
+    out : np.ndarray
+        Array of shape (4, sites, timesteps) to write the result to, e.g. a
+        memory mapped file for a large number of sites.
+    Returns
+    -------
+    e : np.ndarray
+        Global, direct, diffuse and reflected radiation (see
+        :data:`COMPONENTS`) of shape (4, sites, timesteps).
+    Note
+    ----
+    Calendar, declination and time equation depend only on the timestamps
+    and are calculated once for all sites. The compiled kernel evaluates the
+    rest per site and timestep without temporary arrays and matches the
+    NumPy model within floating point tolerance.
+    """
+    if engine is None:
+        engine = 'numba' if NUMBA else 'numpy'
+    if engine not in ENGINES:
+        raise ValueError('Unknown engine {0}, use one of {1}.'.format(
+            engine, ENGINES))
+    if engine == 'numba' and not NUMBA:
+        raise ImportError('The numba engine requires numba.')
+
+    phi = np.atleast_1d(np.asarray(phi, dtype=float)) * np.pi / 180
+    lam = np.atleast_1d(np.asarray(lam, dtype=float)) * np.pi / 180
+    phi, lam = (np.ascontiguousarray(v) for v in np.broadcast_arrays(phi, lam))
+    sites = len(phi)
+    timesteps = len(datetime)
+
+    e_dir_hor, e_diff_hor, e_g_hor = (
+        _site_series(e, sites, timesteps, name) for e, name in
+        [(e_dir_hor, 'e_dir_hor'), (e_diff_hor, 'e_diff_hor'),
+         (e_g_hor, 'e_g_hor')])
+    gamma_e, alpha_e, albedo = (
+        _site_values(value, sites, name) for value, name in
+        [(gamma_e, 'gamma_e'), (alpha_e, 'alpha_e'), (albedo, 'albedo')])
+
+    if out is None:
+        out = np.empty((4, sites, timesteps))
+    elif out.shape != (4, sites, timesteps):
+        raise ValueError('out must have shape {0}, not {1}.'.format(
+            (4, sites, timesteps), out.shape))
+
+    terms = _time_terms(datetime, timezone)
+
+    with stage('sites'):
+        for start in range(0, sites, chunksize):
+            chunk = slice(start, start + chunksize)
+            out[:, chunk] = _evaluate(
+                terms, phi[chunk], lam[chunk],
+                *(e[chunk] if len(e) > 1 else e
+                  for e in (e_dir_hor, e_diff_hor, e_g_hor)),
+                gamma_e[chunk], alpha_e[chunk], albedo[chunk], engine)
+
+    return out
+
+
+def radiation_cells(phi, lam, datetime, e_dir_hor, e_diff_hor, e_g_hor,
+                    gamma_e=0, alpha_e=0, albedo=0, timezone='UTC',
+                    engine=None):
+    r"""
+    Calculate radiation on tilted planes of many cells as dict.
+
+    Same as :func:`calculate_radiation_sites` in one chunk, the result is a
+    dict holding arrays of global, direct (dir), diffuse (diff) and
+    reflected (refl) radiation of shape (cells, timesteps).
+    """
+    e = calculate_radiation_sites(
+        phi=phi, lam=lam, timezone=timezone, gamma_e=gamma_e,
+        alpha_e=alpha_e, albedo=albedo, datetime=datetime,
+        e_dir_hor=e_dir_hor, e_diff_hor=e_diff_hor, e_g_hor=e_g_hor,
+        chunksize=max(1, np.size(phi)), engine=engine)
+    return dict(zip(COMPONENTS, e))
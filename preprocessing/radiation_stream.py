@@ -0,0 +1,134 @@
+"""Chunked calculation of radiation on tilted plane for long weather records."""
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from alignment import to_utc
+from ratipl import calculate_radiation_array
+
+
+def iter_radiation(readpath, phi=0, lam=0, timezone='UTC', gamma_e=0,
+                   alpha_e=0, albedo=0, chunksize=8760, sep=',',
+                   date_col='utc_timestamp',
+                   dir_col='DEF0_radiation_direct_horizontal',
+                   diff_col='DEF0_radiation_diffuse_horizontal'):
+    r"""
+    Read a weather file in chunks and yield the radiation on tilted plane.
+    Parameters
+    ----------
+    readpath : str
+        Path to the weather csv file, e.g. solar_weather_data_2012.csv.
+    chunksize : int
+        Number of rows read and calculated at once.
+    date_col : str
+        Column containing the timestamps.
+    dir_col : str
+        Column containing the direct radiation on horizontal plane.
+    diff_col : str
+        Column containing the diffuse radiation on horizontal plane.
+
+    All other parameters are identical to :func:`ratipl.calculate_radiation`.
+
+    Yields
+    ------
+    e : pandas.core.frame.DataFrame
+        Datetime as well as global, direct (dir), diffuse (diff) and
+        reflected (refl) radiation on the tilted plane of one chunk.
+    Note
+    ----
+    Naive timestamps are converted with the wall times of the last day of
+    the previous chunks, so repeated hours at the end of daylight saving
+    time get the same offsets as in a single run over the whole file.
+    """
+    reader = pd.read_csv(readpath, sep=sep, chunksize=chunksize,
+                         usecols=[date_col, dir_col, diff_col])
+    carry = np.array([], dtype='datetime64[ns]')
+
+    for chunk in reader:
+        date = pd.to_datetime(chunk[date_col])
+        if date.dt.tz is None and timezone != 'UTC':
+            date, carry = _localize(date, timezone, carry)
+        e_dir_hor = chunk[dir_col].values
+        e_diff_hor = chunk[diff_col].values
+
+        radiation = calculate_radiation_array(
+            phi=phi, lam=lam, timezone=timezone, gamma_e=gamma_e,
+            alpha_e=alpha_e, albedo=albedo, datetime=date,
+            e_dir_hor=e_dir_hor, e_diff_hor=e_diff_hor,
+            e_g_hor=e_dir_hor + e_diff_hor)
+
+        e = pd.DataFrame({'date': chunk[date_col].values})
+        for key in ['global', 'dir', 'diff', 'refl']:
+            e[key] = radiation[key]
+
+        yield e
+
+
+def _localize(date, timezone, carry):
+    r"""
+    Localize the naive timestamps of a chunk.
+    Parameters
+    ----------
+    date : pandas.core.series.Series
+        Naive local timestamps of the chunk.
+    timezone : str
+        Name of the time zone.
+    carry : np.ndarray
+        Wall times of the previous chunks within one day of the latest.
+    Returns
+    -------
+    date : pandas.core.series.Series
+        Timestamps in `timezone`.
+    carry : np.ndarray
+        Wall times to pass to the next chunk.
+    """
+    wall = np.concatenate([carry, date.values.astype('datetime64[ns]')])
+    utc = to_utc(wall, timezone)[len(carry):]
+    date = pd.Series(utc.tz_convert(timezone), index=date.index)
+
+    valid = wall[~np.isnat(wall)]
+    if len(valid):
+        carry = valid[valid >= valid.max() - np.timedelta64(1, 'D')]
+    return date, carry
+
+
+def stream_radiation(readpath, writepath, sep_out=';', **kwargs):
+    r"""
+    Calculate radiation on tilted plane chunk by chunk and write to file.
+    Parameters
+    ----------
+    readpath : str
+        Path to the weather csv file.
+    writepath : str
+        Path to the output csv file, an existing file is overwritten.
+    sep_out : str
+        Separator of the output file.
+
+    Further keyword arguments are passed to :func:`iter_radiation`. Only one
+    chunk is held in memory at a time. A file holds the records of one
+    station, several stations are streamed with one call per file (many
+    sites with common timestamps, see
+    :func:`radiation_kernel.calculate_radiation_sites`).
+
+    Returns
+    -------
+    stats : dict
+        Number of rows, runtime in seconds and throughput in rows/second.
+    """
+    if os.path.isfile(writepath):
+        os.remove(writepath)
+
+    rows = 0
+    start = time.perf_counter()
+
+    for e in iter_radiation(readpath, **kwargs):
+        e.to_csv(writepath, sep=sep_out, na_rep='#N/A', index=False,
+                 mode='a', header=rows == 0)
+        rows += len(e)
+
+    seconds = time.perf_counter() - start
+
+    return {'rows': rows, 'seconds': seconds,
+            'rows_per_second': rows / seconds if seconds > 0 else float('inf')}
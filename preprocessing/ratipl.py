@@ -1,13 +1,171 @@
 """Algorithm to determine radiation on tilted plane."""
+from functools import lru_cache
+
 import numpy as np
 import pandas as pd
 
+from stage_profiling import stage
 
-def calculate_radiation(phi=0, lam=0, timezone='UTC', gamma_e=0,
-                        alpha_e=0, albedo=0, datetime=np.nan,
-                        e_dir_hor=np.nan, e_diff_hor=np.nan, e_g_hor=np.nan):
+
+_HOUR = 3600 * 10 ** 9
+_DAY = 24 * _HOUR
+
+# version of the sun position model, part of the key of cached tables
+# (sun_cache.SunPositionCache), increase it whenever the output of
+# sun_position changes
+SUN_POSITION_VERSION = 3
+
+
+def _check_length(datetime, e_dir_hor, e_diff_hor, e_g_hor):
+    """Check if length of the input series match."""
+    timesteps = len(datetime)
+
+    if (len(e_dir_hor) != timesteps or
+            len(e_diff_hor) != timesteps or
+            len(e_g_hor) != timesteps):
+        msg = ('The number of elements for all of the input series (datetime, '
+               'e_dir_hor, e_diff_hor, e_g_hor) must be identical.')
+        raise ValueError(msg)
+
+
+@lru_cache(maxsize=32)
+def _transitions(timezone, start, stop):
     r"""
-    Calculate radiation on a tilted following DIN 5034-2.
+    Get the offsets of a time zone against UTC and when they change.
+    Parameters
+    ----------
+    timezone : str/datetime.tzinfo
+        Time zone.
+    start : int
+        First day covered, in days since 1970-01-01 (UTC).
+    stop : int
+        Last day covered.
+    Returns
+    -------
+    instants : np.ndarray
+        UTC instants in ns at which the offset changes.
+    offsets : np.ndarray
+        Offset in ns before the first change and after every change.
+    Note
+    ----
+    The offset is evaluated once per day, only the days on which it changes
+    are resolved to the minute.
+    """
+    days = pd.DatetimeIndex(np.arange(start, stop + 1) * _DAY, tz='UTC')
+    offset = _offset(days, timezone)
+
+    instants = []
+    offsets = [offset[0]]
+    for i in np.flatnonzero(np.diff(offset)):
+        minutes = days[i] + pd.to_timedelta(np.arange(1, 1441), unit='m')
+        day_offset = np.concatenate([offset[i:i + 1],
+                                     _offset(minutes, timezone)])
+        for j in np.flatnonzero(np.diff(day_offset)):
+            instants += [minutes[j].value]
+            offsets += [day_offset[j + 1]]
+
+    return np.array(instants, dtype=np.int64), np.array(offsets)
+
+
+def _offset(index, timezone):
+    """Offset of `timezone` against UTC in ns at UTC timestamps."""
+    return (index.tz_convert(timezone).tz_localize(None).asi8 -
+            index.tz_localize(None).asi8)
+
+
+def _wall_offset(wall, instants, offsets):
+    r"""
+    Get the offset of local wall times from the transitions of a time zone.
+
+    Wall times skipped at the start of daylight saving time take the offset
+    before the change. Repeated wall times at its end take the offset
+    before the change at their first and the offset after the change at
+    every further occurrence, so a complete series is read in order.
+    """
+    if not len(instants):
+        return np.full(len(wall), offsets[0])
+
+    before = offsets[:-1]
+    after = offsets[1:]
+    lower = instants + np.minimum(before, after)
+    upper = instants + np.maximum(before, after)
+
+    # number of transitions starting at or before the wall time
+    k = np.searchsorted(lower, wall, side='right')
+    offset = offsets[k]
+
+    # wall times inside the gap or overlap of the previous transition
+    prev = np.maximum(k - 1, 0)
+    inside = (k > 0) & (wall < upper[prev])
+    offset = np.where(inside, before[prev], offset)
+
+    repeated = np.flatnonzero(inside & (after[prev] < before[prev]))
+    if len(repeated):
+        first = np.unique(wall[repeated], return_index=True)[1]
+        later = np.ones(len(repeated), dtype=bool)
+        later[first] = False
+        offset[repeated[later]] = after[prev][repeated[later]]
+
+    return offset
+
+
+def _time_difference(datetime, timezone):
+    r"""
+    Get local wall time and the difference to UTC in hours.
+    Parameters
+    ----------
+    datetime : np.ndarray/pandas.core.series.Series
+        Timestamp, values must be in datetime format. Naive timestamps are
+        interpreted as local time of `timezone`.
+    timezone : str
+        Name of the time zone.
+    Returns
+    -------
+    local : np.ndarray
+        Local wall time as datetime64 array.
+    td : np.ndarray
+        Difference between local time and UTC in hours (NaN for missing
+        timestamps).
+    Note
+    ----
+    The offset is determined once per period between two transitions of the
+    time zone and broadcast to the timestamps. Naive timestamps skipped at
+    the start of daylight saving time are read with the offset before the
+    change, repeated ones at its end in the order they occur (first with
+    daylight saving time), see :func:`_wall_offset`.
+    """
+    date = pd.DatetimeIndex(datetime)
+    nat = np.asarray(date.isna())
+    if date.tz is not None:
+        timezone = date.tz
+
+    # UTC for aware, wall time for naive timestamps, in ns
+    values = date.values.astype('datetime64[ns]').view(np.int64)
+    if nat.all():
+        return values.view('datetime64[ns]'), np.full(len(values), np.nan)
+    values[nat] = values[~nat][0]
+
+    instants, offsets = _transitions(timezone, values.min() // _DAY - 1,
+                                     values.max() // _DAY + 1)
+
+    if date.tz is None:
+        offset = _wall_offset(values, instants, offsets)
+        local = values
+    else:
+        offset = offsets[np.searchsorted(instants, values, side='right')]
+        local = values + offset
+
+    local = local.view('datetime64[ns]')
+    local[nat] = np.datetime64('NaT')
+    td = np.where(nat, np.nan, offset / _HOUR)
+
+    return local, td
+
+
+def sun_position(phi=0, lam=0, timezone='UTC', datetime=np.nan, cache=None,
+                 substeps=1, interval=None, label='left'):
+    r"""
+    Calculate the position of the sun following DIN 5034-2.
     Parameters
     ----------
     phi : numeric
@@ -16,70 +174,197 @@ def calculate_radiation(phi=0, lam=0, timezone='UTC', gamma_e=0,
         Longitude.
     timezone : str
         Name of the time zone.
-    gamma_e : numeric
-        Angle of inclination measured from horizontal position.
-    alpha_e : numeric
-        South exposure: 0° south, 90° east, 180° north, 270° west.
     datetime : np.ndarray/pandas.core.series.Series
         Timestamp, values must be in datetime format.
-    e_dir_hor : np.ndarray/pandas.core.series.Series
-        Direct radiation on horizontal plane.
-    e_diff_hor : np.ndarray/pandas.core.series.Series
-        Diffuse radiation on horizontal plane.
-    e_g_hor : np.ndarray/pandas.core.series.Series
-        Global radiation on horizontal plane.
+    cache : sun_cache.SunPositionCache
+        Cache to look up the sun position before calculating it.
+    substeps : int
+        Number of sub-steps per interval. With more than one the sun position
+        is averaged over the interval of every timestamp, see Note.
+    interval : str/pandas.Timedelta
+        Length of the intervals, e.g. '1h'. Inferred from the timestamps if
+        None.
+    label : str
+        Position of the timestamp in its interval: 'left' (start), 'center'
+        or 'right' (end).
     Returns
     -------
-    e : pandas.core.frame.DataFrame
-        Dataframe containing the datetime as well as global, direct (dir),
-        diffuse (diff) and reflected (refl) radiation on the tilted plane.
+    sun : dict
+        Arrays of sun declination (delta), time equation (zgl), real local
+        time (woz), hour angle (omega), sun height (gamma_s) and sun azimuth
+        (alpha_s). Angles are in rad.
+    Note
+    ----
+    Radiation data is usually averaged over the interval, so the sun position
+    at the timestamp misrepresents the hours of sunrise and sunset. With
+    sub-steps, the geometry is evaluated at the centres of `substeps` equal
+    parts of every interval in one (timesteps, substeps) array. Sun height
+    and azimuth are the direction of the mean sun vector over the sub-steps
+    with the sun above the horizon. As the incidence angle is linear in the
+    sun vector, the ratio of tilted to horizontal direct radiation of this
+    direction is the ratio of their interval means. Declination, time
+    equation and hour angle are interval means.
     """
+    _check_substeps(substeps)
+
+    if cache is not None:
+        with stage('sun_cache'):
+            key = cache.key(phi, lam, timezone, datetime,
+                            options=_sub_options(substeps, interval, label))
+            sun = cache.get(key)
+            if sun is None:
+                sun = sun_position(phi=phi, lam=lam, timezone=timezone,
+                                   datetime=datetime, substeps=substeps,
+                                   interval=interval, label=label)
+                cache.put(key, sun)
+        return sun
+
     # transform angles from deg to rad
     phi = phi * np.pi / 180
     lam = lam * np.pi / 180
-    gamma_e = gamma_e * np.pi / 180
-    alpha_e = alpha_e * np.pi / 180
 
-    # check if length of the input series match
-    timesteps = len(datetime)
+    with stage('timezone'):
+        local, td = _time_difference(datetime, timezone)
 
-    if (len(e_dir_hor) != timesteps or
-            len(e_diff_hor) != timesteps or
-            len(e_g_hor) != timesteps):
-        msg = ('The number of elements for all of the input series (datetime, '
-               'e_dir_hor, e_diff_hor, e_g_hor) must be identical.')
-        raise ValueError(msg)
+    if substeps == 1:
+        return _sun_geometry(phi, lam, local, td)
+
+    with stage('substeps'):
+        offsets = _substep_offsets(local, substeps, interval, label)
+        local = local[:, None] + offsets
+        td = td[:, None]
+
+    sun = _sun_geometry(phi, lam, local, td)
+
+    with stage('average'):
+        return _interval_mean(sun)
+
+
+def _sub_options(substeps, interval, label):
+    """Options of the sun position distinguishing cached tables."""
+    if substeps == 1:
+        return None
+    return {'substeps': int(substeps), 'interval': str(interval),
+            'label': label}
 
-    # new DataFrame e
-    e = pd.DataFrame(datetime, columns=['date'])
 
-    # set datetime with timezone
-    if e['date'].dt.tz is None:
-        e['date_timezone'] = e['date'].dt.tz_localize(
-                timezone, nonexistent='NaT', ambiguous='NaT')
+def _check_substeps(substeps):
+    """Raise a ValueError unless `substeps` is an integer of at least 1."""
+    if (isinstance(substeps, (bool, np.bool_)) or
+            not isinstance(substeps, (int, np.integer)) or substeps < 1):
+        raise ValueError('substeps must be an integer of at least 1, not '
+                         '{0!r}.'.format(substeps))
+
+
+def _substep_offsets(local, substeps, interval, label):
+    """Offsets of the sub-step centres against the timestamps."""
+    _check_substeps(substeps)
+    shift = {'left': 0, 'center': -0.5, 'right': -1}
+    if label not in shift:
+        raise ValueError("label must be 'left', 'center' or 'right', not "
+                         "{0}.".format(label))
+
+    if interval is None:
+        valid = local[~np.isnat(local)]
+        if len(valid) < 2:
+            raise ValueError('The interval cannot be inferred from less than '
+                             'two timestamps.')
+        interval = np.median(np.diff(valid).astype(np.int64))
     else:
-        e['date_timezone'] = e['date']
+        interval = pd.Timedelta(interval).value
+
+    fraction = (np.arange(substeps) + 0.5) / substeps + shift[label]
+    return np.round(fraction * interval).astype('timedelta64[ns]')
+
+
+def _sun_geometry(phi, lam, local, td):
+    r"""
+    Sun position at local wall times.
+    Parameters
+    ----------
+    phi : numeric
+        Latitude in rad.
+    lam : numeric
+        Longitude in rad.
+    local : np.ndarray
+        Local wall time, datetime64 array of any shape.
+    td : np.ndarray
+        Difference between local time and UTC in hours, broadcastable to
+        `local`.
+    """
+    with stage('calendar'):
+        j, lz = _calendar(local)
 
-    # get datetime in utc time
-    e['date_timezone_utc'] = e['date_timezone'].dt.tz_convert('UTC')
+    with stage('sun'):
+        delta, zgl = _declination(j)
+        return _sun_angles(phi, lam, lz - td, delta, zgl)
 
-    # calculate time difference
-    e['td'] = (e['date_timezone'].dt.hour - e['date_timezone_utc'].dt.hour)
 
-    e.loc[e['td'] > 12, 'td'] = 24 - e['td']
-    e.loc[e['td'] < -12, 'td'] = 24 + e['td']
+def _sun_angles(phi, lam, hour, delta, zgl):
+    r"""
+    Sun position from the time dependent terms.
+    Parameters
+    ----------
+    phi : numeric/np.ndarray
+        Latitude in rad.
+    lam : numeric/np.ndarray
+        Longitude in rad.
+    hour : np.ndarray
+        Local time in hours minus the difference to UTC.
+    delta : np.ndarray
+        Sun declination in rad.
+    zgl : np.ndarray
+        Time equation in min.
+    Note
+    ----
+    Only latitude and longitude depend on the site, e.g. arrays of shape
+    (sites, 1) give the sun position of all sites with the time dependent
+    terms shared.
+    """
+    # get mean local time by timezone and local time
+    moz = hour + 4 * lam * 180 / np.pi / 60
 
-    # calculate day of year
-    e['doy'] = e['date'].dt.dayofyear
+    # calculate real local time woz and hour angle omega
+    woz = moz + zgl / 60
+    omega = (12 - woz) * 15 * np.pi / 180
+
+    # calculate sun hight and azimuth
+    gamma_s = np.arcsin(np.cos(omega) * np.cos(phi) * np.cos(delta) +
+                        np.sin(phi) * np.sin(delta))
+
+    with np.errstate(invalid='ignore'):
+        expr = np.arccos((np.sin(gamma_s) * np.sin(phi) - np.sin(delta)) /
+                         (np.cos(gamma_s) * np.cos(phi)))
+
+    alpha_s = np.where(woz <= 12, np.pi - expr,
+                       np.where(woz > 12, np.pi + expr, np.pi))
+
+    return {'delta': delta, 'zgl': zgl, 'woz': woz, 'omega': omega,
+            'gamma_s': gamma_s, 'alpha_s': alpha_s}
+
+
+def _calendar(local):
+    """Get J' parameter and local time in hours of local wall times."""
+    # calculate day of year and second of day
+    nat = np.isnat(local)
+    day = local.astype('datetime64[D]')
+    doy = (day - local.astype('datetime64[Y]')).astype(int) + 1
+    doy = np.where(nat, np.nan, doy)
+    sod = (local.astype('datetime64[s]') - day).astype(int)
 
     # number of days in a year
-    leap_year = e['date'].dt.is_leap_year
-    e['diy'] = np.nan
-    e.loc[leap_year == True, 'diy'] = 366
-    e.loc[leap_year == False, 'diy'] = 365
+    year = local.astype('datetime64[Y]').astype(int) + 1970
+    leap_year = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+    diy = np.where(leap_year & ~nat, 366., 365.)
 
     # J' parameter
-    j = 360 * e['doy'] / e['diy']
+    j = 360 * doy / diy
+    lz = np.where(nat, np.nan, sod // 3600 + sod % 3600 / 3600)
+    return j, lz
+
+
+def _declination(j):
+    """Get sun declination in rad and time equation in min from J'."""
     # sun declination as function of J'
     delta = np.pi / 180 * (
             0.3948 - 23.2559 * np.cos((j + 9.1) * np.pi / 180) -
@@ -91,57 +376,283 @@ def calculate_radiation(phi=0, lam=0, timezone='UTC', gamma_e=0,
     zgl = (0.0066 + 7.3525 * np.cos((j + 85.9) * np.pi / 180) +
            9.9359 * np.cos((2 * j + 108.9) * np.pi / 180) +
            0.3387 * np.cos((3 * j + 105.2) * np.pi / 180))
+    return delta, zgl
 
-    # get mean local time by timezone and local time
-    lz = e['date'].dt.hour + e['date'].dt.minute / 60
-    moz = lz - e['td'] + 4 * lam * 180 / np.pi / 60
 
-    # calculate real local time woz and hour angle omega
-    e['woz'] = moz + zgl / 60
-    omega = (12 - e['woz']) * 15 * np.pi / 180
+def _interval_mean(sun):
+    """Average a sun position over its sub-steps (second axis)."""
+    gamma_s, alpha_s = sun['gamma_s'], sun['alpha_s']
 
-    # calculate sun hight and azimuth
-    gamma_s = np.arcsin(np.cos(omega) * np.cos(phi) * np.cos(delta) +
-                        np.sin(phi) * np.sin(delta))
+    # sub-steps with the sun above the horizon, all of them during the night
+    up = gamma_s > 0
+    weight = np.where(up.any(axis=1, keepdims=True), up, True)
 
-    e['alpha_s'] = np.pi
+    x = np.average(np.cos(gamma_s) * np.cos(alpha_s), axis=1, weights=weight)
+    y = np.average(np.cos(gamma_s) * np.sin(alpha_s), axis=1, weights=weight)
+    z = np.average(np.sin(gamma_s), axis=1, weights=weight)
 
-    expr = np.arccos((np.sin(gamma_s) * np.sin(phi) - np.sin(delta)) /
-                     (np.cos(gamma_s) * np.cos(phi)))
+    # hour angle as circular mean, woz wraps at midnight
+    omega = np.arctan2(np.sin(sun['omega']).mean(axis=1),
+                       np.cos(sun['omega']).mean(axis=1))
 
-    e.loc[e['woz'] <= 12, 'alpha_s'] -= expr
-    e.loc[e['woz'] > 12, 'alpha_s'] += expr
+    return {'delta': sun['delta'].mean(axis=1),
+            'zgl': sun['zgl'].mean(axis=1),
+            'woz': 12 - omega * 180 / np.pi / 15,
+            'omega': omega,
+            'gamma_s': np.arctan2(z, np.hypot(x, y)),
+            'alpha_s': np.arctan2(y, x) % (2 * np.pi)}
 
-    # calculation of angle of incidence theta_tilt on tilted plane
-    theta_tilt = np.arccos(
-            -np.cos(gamma_s) * np.sin(gamma_e) *
-            np.cos(e['alpha_s'] - alpha_e) +
-            np.sin(gamma_s) * np.cos(gamma_e)
-            )
+
+def radiation_on_tilted_plane(sun, gamma_e=0, alpha_e=0, albedo=0,
+                              e_dir_hor=np.nan, e_diff_hor=np.nan,
+                              e_g_hor=np.nan):
+    r"""
+    Split horizontal radiation onto a tilted plane for a given sun position.
+    Parameters
+    ----------
+    sun : dict
+        Sun position as returned by :func:`sun_position`.
+    gamma_e : numeric
+        Angle of inclination measured from horizontal position.
+    alpha_e : numeric
+        South exposure: 0° south, 90° east, 180° north, 270° west.
+    albedo : numeric
+        Reflectivity of the ground.
+    e_dir_hor : np.ndarray
+        Direct radiation on horizontal plane.
+    e_diff_hor : np.ndarray
+        Diffuse radiation on horizontal plane.
+    e_g_hor : np.ndarray
+        Global radiation on horizontal plane.
+    Returns
+    -------
+    e : dict
+        Arrays of global, direct (dir), diffuse (diff) and reflected (refl)
+        radiation on the tilted plane.
+    """
+    gamma_e = gamma_e * np.pi / 180
+    alpha_e = alpha_e * np.pi / 180
+
+    gamma_s = sun['gamma_s']
+    e_dir_hor = np.asarray(e_dir_hor, dtype=float)
+    e_diff_hor = np.asarray(e_diff_hor, dtype=float)
+    e_g_hor = np.asarray(e_g_hor, dtype=float)
+
+    with stage('incidence'):
+        # calculation of angle of incidence theta_tilt on tilted plane
+        theta_tilt = np.arccos(
+                -np.cos(gamma_s) * np.sin(gamma_e) *
+                np.cos(sun['alpha_s'] - alpha_e) +
+                np.sin(gamma_s) * np.cos(gamma_e)
+                )
 
     # calculate radiation on tilted plane
-    # direct radiation
-    K = np.cos(theta_tilt) / np.sin(gamma_s)
+    with stage('tilted'):
+        # direct radiation
+        K = np.cos(theta_tilt) / np.sin(gamma_s)
+
+        limit = 10
+        K = np.where(K > limit, limit, K)
+
+        e_dir = e_dir_hor * K
+        e_dir = np.where(e_dir < 0, 0, e_dir)
+
+        # diffuse radiation
+        with np.errstate(invalid='ignore', divide='ignore'):
+            F = 1 - (e_diff_hor / e_g_hor) ** 2
+        e_diff = (e_diff_hor * 0.5 * (1 + np.cos(gamma_e)) *
+                  (1 + F * np.sin(gamma_e / 2) ** 3) *
+                  (1 + F * np.cos(theta_tilt) ** 2 * np.cos(gamma_s) ** 3))
+
+        e_diff = np.where(np.isnan(e_diff), 0, e_diff)
+
+        # reflection from ground
+        e_refl = e_g_hor * albedo * 0.5 * (1 - np.cos(gamma_e))
+
+        # global radiation on tilted plane
+        e_global = e_dir + e_diff + e_refl
+
+    return {'global': e_global, 'dir': e_dir, 'diff': e_diff,
+            'refl': e_refl}
+
+
+def calculate_radiation_array(phi=0, lam=0, timezone='UTC', gamma_e=0,
+                              alpha_e=0, albedo=0, datetime=np.nan,
+                              e_dir_hor=np.nan, e_diff_hor=np.nan,
+                              e_g_hor=np.nan, cache=None, substeps=1,
+                              interval=None, label='left'):
+    r"""
+    Calculate radiation on a tilted plane on plain arrays.
+
+    Same parameters as :func:`calculate_radiation`, the result is a dict
+    holding arrays of global, direct (dir), diffuse (diff) and reflected
+    (refl) radiation on the tilted plane.
+    """
+    _check_length(datetime, e_dir_hor, e_diff_hor, e_g_hor)
+
+    sun = sun_position(phi=phi, lam=lam, timezone=timezone,
+                       datetime=datetime, cache=cache, substeps=substeps,
+                       interval=interval, label=label)
+
+    return radiation_on_tilted_plane(
+        sun, gamma_e=gamma_e, alpha_e=alpha_e, albedo=albedo,
+        e_dir_hor=e_dir_hor, e_diff_hor=e_diff_hor, e_g_hor=e_g_hor)
+
+
+def calculate_radiation(phi=0, lam=0, timezone='UTC', gamma_e=0,
+                        alpha_e=0, albedo=0, datetime=np.nan,
+                        e_dir_hor=np.nan, e_diff_hor=np.nan, e_g_hor=np.nan,
+                        cache=None, substeps=1, interval=None, label='left'):
+    r"""
+    Calculate radiation on a tilted following DIN 5034-2.
+    Parameters
+    ----------
+    phi : numeric
+        Latitude.
+    lam : numeric
+        Longitude.
+    timezone : str
+        Name of the time zone.
+    gamma_e : numeric
+        Angle of inclination measured from horizontal position.
+    alpha_e : numeric
+        South exposure: 0° south, 90° east, 180° north, 270° west.
+    datetime : np.ndarray/pandas.core.series.Series
+        Timestamp, values must be in datetime format.
+    e_dir_hor : np.ndarray/pandas.core.series.Series
+        Direct radiation on horizontal plane.
+    e_diff_hor : np.ndarray/pandas.core.series.Series
+        Diffuse radiation on horizontal plane.
+    e_g_hor : np.ndarray/pandas.core.series.Series
+        Global radiation on horizontal plane.
+    cache : sun_cache.SunPositionCache
+        Cache to look up the sun position before calculating it.
+    substeps : int
+        Sub-steps per interval to average the sun position over, the sun
+        position at the timestamps if 1.
+    interval : str/pandas.Timedelta
+        Length of the intervals, inferred from the timestamps if None.
+    label : str
+        Position of the timestamps in their intervals: 'left', 'center' or
+        'right'.
+    Returns
+    -------
+    e : pandas.core.frame.DataFrame
+        Dataframe containing the datetime as well as global, direct (dir),
+        diffuse (diff) and reflected (refl) radiation on the tilted plane.
+    """
+    radiation = calculate_radiation_array(
+        phi=phi, lam=lam, timezone=timezone, gamma_e=gamma_e,
+        alpha_e=alpha_e, albedo=albedo, datetime=datetime,
+        e_dir_hor=e_dir_hor, e_diff_hor=e_diff_hor, e_g_hor=e_g_hor,
+        cache=cache, substeps=substeps, interval=interval, label=label)
+
+    with stage('frame'):
+        e = pd.DataFrame({'date': datetime})
+        for key in ['global', 'dir', 'diff', 'refl']:
+            e[key] = radiation[key]
+
+    return e
+
+
+def calculate_radiation_orientations(phi=0, lam=0, timezone='UTC',
+                                     gamma_e=0, alpha_e=0, albedo=0,
+                                     datetime=np.nan, e_dir_hor=np.nan,
+                                     e_diff_hor=np.nan, e_g_hor=np.nan,
+                                     cache=None, substeps=1, interval=None,
+                                     label='left'):
+    r"""
+    Calculate radiation on several tilted planes at once.
+
+    The sun position is calculated only once and the incidence angle is
+    broadcasted over all orientations. `gamma_e` and `alpha_e` may be
+    scalars or arrays of equal length, all other parameters are identical to
+    :func:`calculate_radiation`.
+
+    Returns
+    -------
+    e : dict
+        Arrays of global, direct (dir), diffuse (diff) and reflected (refl)
+        radiation with shape (orientations, timesteps).
+    """
+    gamma_e, alpha_e = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(gamma_e, dtype=float)),
+        np.atleast_1d(np.asarray(alpha_e, dtype=float)))
+
+    _check_length(datetime, e_dir_hor, e_diff_hor, e_g_hor)
 
-    limit = 10
-    K[K > limit] = limit
+    sun = sun_position(phi=phi, lam=lam, timezone=timezone,
+                       datetime=datetime, cache=cache, substeps=substeps,
+                       interval=interval, label=label)
 
-    e['dir'] = e_dir_hor * K
+    return _radiation_orientations(sun, gamma_e, alpha_e, albedo,
+                                   e_dir_hor, e_diff_hor, e_g_hor)
+
+
+def _radiation_orientations(sun, gamma_e, alpha_e, albedo,
+                            e_dir_hor, e_diff_hor, e_g_hor):
+    """Broadcast the tilted plane radiation over 1-D orientation arrays."""
+    e = radiation_on_tilted_plane(
+        sun, gamma_e=gamma_e[:, None], alpha_e=alpha_e[:, None],
+        albedo=albedo, e_dir_hor=e_dir_hor, e_diff_hor=e_diff_hor,
+        e_g_hor=e_g_hor)
+
+    shape = (len(gamma_e), len(sun['gamma_s']))
+    return {key: np.broadcast_to(value, shape) for key, value in e.items()}
+
+
+def optimal_orientation(phi=0, lam=0, timezone='UTC',
+                        gamma_e=np.arange(0, 91, 5),
+                        alpha_e=np.arange(-90, 91, 10), albedo=0,
+                        datetime=np.nan, e_dir_hor=np.nan, e_diff_hor=np.nan,
+                        e_g_hor=np.nan, chunksize=100, cache=None,
+                        substeps=1, interval=None, label='left'):
+    r"""
+    Scan a grid of orientations for the highest radiation yield.
+    Parameters
+    ----------
+    gamma_e : array-like
+        Angles of inclination to scan.
+    alpha_e : array-like
+        South exposures to scan (0° south, 90° east, -90° west).
+    chunksize : int
+        Number of orientations evaluated in one vectorized pass, limits the
+        memory usage.
+
+    All other parameters are identical to :func:`calculate_radiation`.
+
+    Returns
+    -------
+    orientations : pandas.core.frame.DataFrame
+        Sum of global, direct (dir), diffuse (diff) and reflected (refl)
+        radiation for every combination of `gamma_e` and `alpha_e`, sorted
+        by global radiation in descending order.
+    """
+    gamma_grid, alpha_grid = np.meshgrid(
+        np.asarray(gamma_e, dtype=float), np.asarray(alpha_e, dtype=float),
+        indexing='ij')
+    gamma_grid = gamma_grid.ravel()
+    alpha_grid = alpha_grid.ravel()
 
-    e.loc[e['dir'] < 0, 'dir'] = 0
+    sums = {key: np.empty(len(gamma_grid))
+            for key in ['global', 'dir', 'diff', 'refl']}
 
-    # diffuse radiation
-    F = 1 - (e_diff_hor / e_g_hor) ** 2
-    e['diff'] = (e_diff_hor * 0.5 * (1 + np.cos(gamma_e)) *
-                 (1 + F * np.sin(gamma_e / 2) ** 3) *
-                 (1 + F * np.cos(theta_tilt) ** 2 * np.cos(gamma_s) ** 3))
+    _check_length(datetime, e_dir_hor, e_diff_hor, e_g_hor)
 
-    e.loc[e['diff'].isna(), 'diff'] = 0
+    sun = sun_position(phi=phi, lam=lam, timezone=timezone,
+                       datetime=datetime, cache=cache, substeps=substeps,
+                       interval=interval, label=label)
 
-    # reflection from ground
-    e['refl'] = e_g_hor * albedo * 0.5 * (1 - np.cos(gamma_e))
+    for start in range(0, len(gamma_grid), chunksize):
+        stop = start + chunksize
+        e = _radiation_orientations(
+            sun, gamma_grid[start:stop], alpha_grid[start:stop], albedo,
+            e_dir_hor, e_diff_hor, e_g_hor)
+        for key in sums:
+            sums[key][start:stop] = np.nansum(e[key], axis=1)
 
-    # global radiation on tilted plane
-    e['global'] = e['dir'] + e['diff'] + e['refl']
+    orientations = pd.DataFrame({'gamma_e': gamma_grid,
+                                 'alpha_e': alpha_grid, **sums})
 
-    return e[['date', 'global', 'dir', 'diff', 'refl']]
\ No newline at end of file
+    return orientations.sort_values(
+        'global', ascending=False, ignore_index=True)
@@ -0,0 +1,201 @@
+"""Batch evaluation of solar thermal scenarios."""
+from concurrent.futures import ProcessPoolExecutor
+import os
+
+import numpy as np
+import pandas as pd
+
+from alignment import align, from_local_time, target_index, to_utc
+from collector import collector_heat_yield
+from ratipl import _check_length, radiation_on_tilted_plane, sun_position
+from series_store import load_series
+from shared_arrays import SharedArrays, attach
+
+
+COLUMNS = ['name', 'latitude', 'longitude', 'inclination', 'azimuth',
+           'albedo', 'collector', 'weather', 'year']
+
+RADIATION = {'date': 'utc_timestamp',
+             'dir': 'DEF0_radiation_direct_horizontal',
+             'diff': 'DEF0_radiation_diffuse_horizontal'}
+
+_data = {}
+
+
+def _share_inputs(scenarios, ambient, supply, shared):
+    """Load and align the inputs once, store them in shared arrays."""
+    for name in scenarios['weather'].unique():
+        weather = load_series(name, columns=list(RADIATION.values()))
+        date = to_utc(weather[RADIATION['date']]).tz_localize(None)
+        shared.put(('date', name), date.values)
+        shared.put(('dir', name), weather[RADIATION['dir']].values)
+        shared.put(('diff', name), weather[RADIATION['diff']].values)
+
+    ambient = load_series(ambient, columns=['time', 'local_time',
+                                            'temperature'])
+    supply = load_series(supply, columns=['Date', 'feed flow temperature',
+                                          'average return flow'])
+    amb_time = from_local_time(ambient['time'], ambient['local_time'])[0]
+    swfl_time = to_utc(supply['Date'])   # no daylight saving time in the data
+
+    for year in scenarios['year'].unique():
+        target = target_index(year)
+        shared.put(('amb', year),
+                   align(ambient['temperature'].values, amb_time, target))
+        shared.put(('feed', year),
+                   align(supply['feed flow temperature'].values, swfl_time,
+                         target))
+        shared.put(('return', year),
+                   align(supply['average return flow'].values, swfl_time,
+                         target))
+
+
+def _init_worker(collectors, handles):
+    """Attach the shared input arrays once per worker process."""
+    _data.clear()
+    _data['collectors'] = collectors.rename(columns=str.strip).set_index(
+        'typ')
+    _data['arrays'] = attach(handles)
+
+
+def _evaluate_site(group):
+    r"""
+    Evaluate all scenarios of one site and weather series.
+    Parameters
+    ----------
+    group : pandas.core.frame.DataFrame
+        Scenarios sharing latitude, longitude and weather.
+    Returns
+    -------
+    names : list
+        Scenario names.
+    q_solar : numpy.ndarray
+        Solar heat in MWh/m² of shape (scenarios, 8760).
+    """
+    first = group.iloc[0]
+    arrays = _data['arrays']
+    e_dir_hor = arrays[('dir', first['weather'])]
+    e_diff_hor = arrays[('diff', first['weather'])]
+    e_g_hor = e_dir_hor + e_diff_hor
+    datetime = arrays[('date', first['weather'])]
+    _check_length(datetime, e_dir_hor, e_diff_hor, e_g_hor)
+
+    # the sun position is shared by all orientations of the site
+    sun = sun_position(phi=first['latitude'], lam=first['longitude'],
+                       datetime=datetime)
+    radiation = radiation_on_tilted_plane(
+        sun, gamma_e=group['inclination'].values[:, None],
+        alpha_e=group['azimuth'].values[:, None],
+        albedo=group['albedo'].values[:, None], e_dir_hor=e_dir_hor,
+        e_diff_hor=e_diff_hor, e_g_hor=e_g_hor)['global']
+    radiation = np.broadcast_to(radiation, (len(group), len(datetime)))
+    source = to_utc(datetime)
+
+    q_solar = np.empty((len(group), 8760))
+    for i, scenario in enumerate(group.itertuples(index=False)):
+        year = scenario.year
+        total_radiation = align(radiation[i], source,
+                                target_index(scenario.year))
+        eta, q = collector_heat_yield(
+            total_radiation, arrays[('feed', year)],
+            arrays[('return', year)], arrays[('amb', year)],
+            _data['collectors'].loc[scenario.collector])
+        q_solar[i] = q / 1e3
+
+    return list(group['name']), q_solar
+
+
+def run_scenarios(scenarios, collectors, ambient='ninja_weather',
+                  supply='swfl', processes=None):
+    r"""
+    Evaluate a table of solar thermal scenarios in parallel.
+    Parameters
+    ----------
+    scenarios : pandas.core.frame.DataFrame
+        One scenario per row with the columns in `COLUMNS`: name, site
+        (latitude, longitude), orientation (inclination, azimuth), albedo,
+        collector type (`typ` in `collectors`), weather series (name in
+        :data:`series_store.SOURCES`) and the year of the common calendar.
+    collectors : pandas.core.frame.DataFrame
+        Collector parameters, e.g. collector_data.csv.
+    ambient : str
+        Series of the ambient temperature.
+    supply : str
+        Series of the feed and return flow temperature.
+    processes : int
+        Number of worker processes, defaults to the number of cores. With
+        one process the scenarios are evaluated in the calling process.
+    Returns
+    -------
+    q_solar : pandas.core.frame.DataFrame
+        Solar heat in MWh/m² with one column per scenario and one row per
+        hour of the year (without 29th of February), empty without
+        scenarios.
+    Note
+    ----
+    Scenarios are grouped by site and weather series, every group is one
+    task. The inputs are loaded and aligned once in the calling process and
+    shared with the workers as memory mapped arrays.
+    """
+    missing = set(COLUMNS) - set(scenarios.columns)
+    if missing:
+        raise ValueError('Scenario columns missing: {0}.'.format(
+            sorted(missing)))
+
+    groups = [group for key, group in scenarios.groupby(
+        ['latitude', 'longitude', 'weather'], sort=False)]
+    if not groups:
+        return pd.DataFrame()
+
+    if processes is None:
+        processes = min(os.cpu_count(), len(groups))
+
+    with SharedArrays() as shared:
+        _share_inputs(scenarios, ambient, supply, shared)
+
+        if processes == 1:
+            _init_worker(collectors, shared.handles)
+            results = [_evaluate_site(group) for group in groups]
+        else:
+            with ProcessPoolExecutor(max_workers=processes,
+                                     initializer=_init_worker,
+                                     initargs=(collectors,
+                                               shared.handles)) as pool:
+                results = list(pool.map(_evaluate_site, groups))
+
+    q_solar = pd.DataFrame(
+        np.vstack([q for names, q in results]).T,
+        columns=[name for names, q in results for name in names])
+    return q_solar[list(scenarios['name'])]
+
+
+if __name__ == '__main__':
+    import time
+
+    dirpath = os.path.abspath(os.path.join(__file__, "../.."))
+    readpath = os.path.join(dirpath, 'Eingangsdaten', 'collector_data.csv')
+    collectors = pd.read_csv(readpath, sep=",", skipinitialspace=True)
+
+    # orientations of the collector field at Flensburg
+    inclination, azimuth = np.meshgrid(np.arange(20, 61, 5),
+                                       np.arange(-30, 31, 15))
+    scenarios = pd.DataFrame({'inclination': inclination.ravel(),
+                              'azimuth': azimuth.ravel()})
+    scenarios['name'] = ['fl_{0}_{1}'.format(i, a) for i, a in zip(
+        scenarios['inclination'], scenarios['azimuth'])]
+    scenarios['latitude'] = 54.7986
+    scenarios['longitude'] = 9.4327
+    scenarios['albedo'] = 0.2
+    scenarios['collector'] = 'flachkollektor_doppelverglasung'
+    scenarios['weather'] = 'solar_weather'
+    scenarios['year'] = 2019
+
+    start = time.perf_counter()
+    q_solar = run_scenarios(scenarios, collectors)
+    print('{0} scenarios in {1:.2f} s'.format(len(scenarios),
+                                             time.perf_counter() - start))
+    print(q_solar.sum().sort_values(ascending=False).head())
+
+    writepath = os.path.join(dirpath, 'Eingangsdaten',
+                             'solarthermal_scenarios.csv')
+    q_solar.to_csv(writepath, sep=';', na_rep='#N/A', index=False)
@@ -0,0 +1,178 @@
+"""Binary columnar storage of the input time series in Eingangsdaten."""
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+
+dirpath = os.path.abspath(os.path.join(__file__, "../.."))
+
+SOURCES = {
+    'solar_weather': {
+        'file': 'solar_weather_data_2012.csv',
+        'read': {'sep': ','},
+        'dates': {'utc_timestamp': {'utc': True}}},
+    'ninja_weather': {
+        'file': 'ninja_weather_54.7986_9.4327_uncorrected2019.csv',
+        'read': {'sep': ','},
+        'dates': {'time': {}, 'local_time': {}}},
+    'ninja_wind': {
+        'file': 'ninja_wind_54.7986_9.4327_corrected.csv',
+        'read': {'sep': ',', 'comment': '#'},
+        'dates': {'time': {}, 'local_time': {}}},
+    'swfl': {
+        'file': 'swfl_data.csv',
+        'read': {'sep': ';'},
+        'dates': {'Date': {'format': '%d.%m.%Y %H:%M'}}},
+}
+
+
+class SeriesStore:
+    r"""
+    Input time series converted once to memory mapped .npy columns.
+    Parameters
+    ----------
+    path : str
+        Directory of the converted series, one subdirectory per series.
+    sources : dict
+        Name of every series with its csv file, the keyword arguments of
+        :func:`pandas.read_csv` and the datetime columns with the keyword
+        arguments of :func:`pandas.to_datetime`.
+    datapath : str
+        Directory of the csv files.
+    Note
+    ----
+    The sha1 hash of the csv file is stored with the columns. If the csv
+    changes, the series is converted again on the next load. Size and
+    modification time are checked first, the file is only hashed if they
+    differ.
+    """
+
+    def __init__(self, path=None, sources=SOURCES, datapath=None):
+        if path is None:
+            path = os.path.join(dirpath, '.cache', 'series')
+        if datapath is None:
+            datapath = os.path.join(dirpath, 'Eingangsdaten')
+        self.path = path
+        self.sources = sources
+        self.datapath = datapath
+
+    def _source(self, name):
+        return os.path.join(self.datapath, self.sources[name]['file'])
+
+    def _meta(self, name):
+        return os.path.join(self.path, name, 'meta.json')
+
+    def convert(self, name):
+        """Parse the csv file of a series and store its columns."""
+        os.makedirs(os.path.join(self.path, name), exist_ok=True)
+        source = self.sources[name]
+        df = pd.read_csv(self._source(name), **source['read'])
+
+        columns = {}
+        for col in df.columns:
+            values = df[col]
+            tz = None
+            if col in source.get('dates', {}):
+                values = pd.to_datetime(values, **source['dates'][col])
+                if values.dt.tz is not None:
+                    tz = str(values.dt.tz)
+                    values = values.dt.tz_convert('UTC').dt.tz_localize(None)
+                values = values.values.astype('datetime64[ns]')
+            else:
+                values = values.to_numpy()
+                if values.dtype == object:
+                    values = values.astype(str)
+            columns[col] = {'file': 'col{0}.npy'.format(len(columns)),
+                            'tz': tz}
+            np.save(os.path.join(self.path, name, columns[col]['file']),
+                    values)
+
+        return columns
+
+    def refresh(self, name):
+        """Convert a series again, return its metadata."""
+        columns = self.convert(name)
+        stat = os.stat(self._source(name))
+        meta = {'source': self.sources[name]['file'],
+                'sha1': _sha1(self._source(name)),
+                'size': stat.st_size, 'mtime': stat.st_mtime,
+                'columns': columns}
+        with open(self._meta(name), 'w') as f:
+            json.dump(meta, f, indent=1)
+        return meta
+
+    def meta(self, name):
+        """Return the metadata of an up-to-date conversion of a series."""
+        if not os.path.isfile(self._meta(name)):
+            return self.refresh(name)
+
+        with open(self._meta(name)) as f:
+            meta = json.load(f)
+        stat = os.stat(self._source(name))
+        if (meta['source'] == self.sources[name]['file'] and
+                meta['size'] == stat.st_size and
+                meta['mtime'] == stat.st_mtime):
+            return meta
+
+        if (meta['source'] != self.sources[name]['file'] or
+                meta['sha1'] != _sha1(self._source(name))):
+            return self.refresh(name)
+
+        # touched, but unchanged
+        meta['size'], meta['mtime'] = stat.st_size, stat.st_mtime
+        with open(self._meta(name), 'w') as f:
+            json.dump(meta, f, indent=1)
+        return meta
+
+    def load(self, name, columns=None, mmap=True):
+        r"""
+        Load a series.
+        Parameters
+        ----------
+        name : str
+            Name of the series in `sources`.
+        columns : list
+            Columns to load, all if None.
+        mmap : bool
+            Memory map the columns (read-only) instead of reading them.
+        Returns
+        -------
+        df : pandas.core.frame.DataFrame
+            Series with the columns of the csv file, datetime columns parsed.
+        """
+        meta = self.meta(name)
+        if columns is None:
+            columns = list(meta['columns'])
+
+        data = {}
+        for col in columns:
+            info = meta['columns'][col]
+            values = np.load(os.path.join(self.path, name, info['file']),
+                             mmap_mode='r' if mmap else None)
+            if info['tz'] is not None:
+                values = pd.DatetimeIndex(values).tz_localize(
+                    'UTC').tz_convert(info['tz'])
+            data[col] = values
+        return pd.DataFrame(data, copy=False)
+
+
+def _sha1(file):
+    digest = hashlib.sha1()
+    with open(file, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+_store = None
+
+
+def load_series(name, columns=None, mmap=True):
+    """Load an input series from the default :class:`SeriesStore`."""
+    global _store
+    if _store is None:
+        _store = SeriesStore()
+    return _store.load(name, columns=columns, mmap=mmap)
@@ -0,0 +1,54 @@
+"""Arrays shared zero-copy between the processes of a worker pool."""
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+
+class SharedArrays:
+    r"""
+    Arrays written once by the parent process, memory mapped by the workers.
+    Parameters
+    ----------
+    path : str
+        Directory of the temporary files, defaults to /dev/shm (memory
+        backed) if available, else the system temporary directory.
+    Note
+    ----
+    Workers only receive the file names (:attr:`handles`) and attach with
+    :func:`attach`. All processes map the same pages, so an additional
+    worker needs no additional memory for the inputs and attaching does not
+    depend on the array size. The files are removed by :meth:`close` or at
+    the end of a `with` block.
+    """
+
+    def __init__(self, path=None):
+        if path is None and os.path.isdir('/dev/shm'):
+            path = '/dev/shm'
+        self.path = tempfile.mkdtemp(prefix='popdh_', dir=path)
+        self.handles = {}
+
+    def put(self, name, array):
+        """Store an array under `name`, return the read-only mapped array."""
+        file = os.path.join(self.path, '{0}.npy'.format(len(self.handles)))
+        np.save(file, np.ascontiguousarray(array))
+        self.handles[name] = file
+        return np.load(file, mmap_mode='r')
+
+    def close(self):
+        """Remove the files, attached workers keep their mappings."""
+        shutil.rmtree(self.path, ignore_errors=True)
+        self.handles = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def attach(handles):
+    """Map the arrays of :attr:`SharedArrays.handles` read-only."""
+    return {name: np.load(file, mmap_mode='r')
+            for name, file in handles.items()}
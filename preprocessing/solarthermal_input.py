@@ -9,33 +9,50 @@ Calculate Solarthermal input
 import os.path as path
 
 import pandas as pd
-import numpy as np
 
-from ratipl import calculate_radiation
+from ratipl import calculate_radiation, optimal_orientation
+from sun_cache import SunPositionCache
+from collector import collector_heat_yield
+from series_store import load_series
+from alignment import align, coverage, from_local_time, target_index, to_utc
 
 
 # %% read data
+# the csv files are converted once and memory mapped afterwards
 # radiation 2012
 dirpath = path.abspath(path.join(__file__, "../.."))
-readpath = path.join(dirpath, 'Eingangsdaten', 'solar_weather_data_2012.csv')
-weather_data = pd.read_csv(readpath, sep=",")
+weather_data = load_series('solar_weather')
 e_global = weather_data['DEF0_radiation_diffuse_horizontal'] + weather_data['DEF0_radiation_direct_horizontal']
-weather_data['utc_timestamp'] = pd.to_datetime(weather_data['utc_timestamp'])
 
-# ambient temperature
-readpath = path.join(dirpath, 'Eingangsdaten', 'ninja_weather_54.7986_9.4327_uncorrected2019.csv')
-amb_data = pd.read_csv(readpath, sep=",")
-amb_temp = np.array(amb_data['temperature'])
+# ambient temperature 2019
+amb_data = load_series('ninja_weather')
 
-# feed and return flow temperature
-readpath = path.join(dirpath, 'Eingangsdaten', 'swfl_data.csv')
-swfl_data = pd.read_csv(readpath, sep=";")
-feed_temp = np.array(swfl_data['feed flow temperature'])
-return_temp = np.array(swfl_data['average return flow'])
+# feed and return flow temperature 2016
+swfl_data = load_series('swfl')
 
 # collector data
 readpath = path.join(dirpath, 'Eingangsdaten', 'collector_data.csv')
-collector_data = pd.read_csv(readpath, sep=",")
+collector_data = pd.read_csv(readpath, sep=",", skipinitialspace=True)
+
+
+# %% common calendar
+# the series of different years are matched by month, day and hour (UTC), the
+# 29th of February is dropped
+year = 2019
+target = target_index(year)
+
+radiation_time = to_utc(weather_data['utc_timestamp'])
+amb_time, _ = from_local_time(amb_data['time'], amb_data['local_time'])
+swfl_time = to_utc(swfl_data['Date'])   # no daylight saving time in the data
+
+for name, source in [('radiation', radiation_time), ('ambient', amb_time),
+                     ('swfl', swfl_time)]:
+    print(name, coverage(source, target))
+
+amb_temp = align(amb_data['temperature'].values, amb_time, target)
+feed_temp = align(swfl_data['feed flow temperature'].values, swfl_time, target)
+return_temp = align(swfl_data['average return flow'].values, swfl_time,
+                    target)
 
 
 # %% determine the radiation on tilted plane 
@@ -45,39 +62,40 @@ inclination = 37
 south = 0
 albedo = 0.2
 
+# sun positions are stored on disk and reused by subsequent runs
+sun_cache = SunPositionCache(path=path.join(dirpath, '.cache', 'sun_position'))
+
 total_radiation = []
 radiation = calculate_radiation(phi=latitude, lam=longitude, gamma_e=inclination,
                                 alpha_e=south, albedo=albedo,
                                 datetime=weather_data['utc_timestamp'].values,
                                 e_dir_hor=weather_data['DEF0_radiation_direct_horizontal'].values,
                                 e_diff_hor=weather_data['DEF0_radiation_diffuse_horizontal'].values,
-                                e_g_hor=e_global.values
+                                e_g_hor=e_global.values,
+                                cache=sun_cache
                                 )
-total_radiation = radiation["global"]           # value in kWh/m²
+# value in kWh/m², from the radiation year onto the common calendar
+total_radiation = align(radiation["global"].values, radiation_time, target)
 
 print(max(total_radiation))
 
-# %% calculate solar collector efficiency
-
-eta_opt = collector_data.iloc[0][1]
-alpha1 = collector_data.iloc[0][2]
-alpha2 = collector_data.iloc[0][3]
-
-col_temp = (feed_temp - return_temp) / 2
+# %% annual radiation yield of alternative orientations
 
-eta = eta_opt - alpha1 * (col_temp - amb_temp)/total_radiation - alpha2 * (col_temp - amb_temp)**2/total_radiation
+orientations = optimal_orientation(phi=latitude, lam=longitude, albedo=albedo,
+                                   datetime=weather_data['utc_timestamp'].values,
+                                   e_dir_hor=weather_data['DEF0_radiation_direct_horizontal'].values,
+                                   e_diff_hor=weather_data['DEF0_radiation_diffuse_horizontal'].values,
+                                   e_g_hor=e_global.values,
+                                   cache=sun_cache
+                                   )
+print(orientations.head())
+print(sun_cache.stats())
 
-i=0
-for x in eta:
-    if x == '-inf':
-        eta[i] = 0
-    elif x<0:
-        eta[i] = 0
-    i += 1
-    
-# %% calculate solar thermal heat per m² -> MWh / m²
+# %% calculate solar collector efficiency and solar thermal heat per m² -> MWh / m²
 
-q_solar = eta * total_radiation / 1e3
+eta, q_solar = collector_heat_yield(total_radiation, feed_temp, return_temp,
+                                    amb_temp, collector_data.iloc[0])
+q_solar = pd.Series(q_solar / 1e3, name='global')
 
 dirpath = path.abspath(path.join(__file__, "../.."))
 writepath = path.join(dirpath, 'Eingangsdaten', 'solarthermal_input.csv')
@@ -0,0 +1,131 @@
+"""Optional stage timing and memory tracking of the preprocessing."""
+import atexit
+from contextlib import contextmanager, nullcontext
+import os
+from time import perf_counter
+import tracemalloc
+
+import pandas as pd
+
+
+_profiler = None
+_off = nullcontext()
+
+
+class StageProfile:
+    r"""
+    Wall time and peak memory of named stages.
+    Parameters
+    ----------
+    memory : bool
+        Track allocations with :mod:`tracemalloc`, which slows down the
+        profiled code.
+    Note
+    ----
+    Stages may be nested, nested stages are reported as `outer/inner`. The
+    peak memory of a stage is the maximum traced memory during the stage
+    above the traced memory at its start.
+    """
+
+    def __init__(self, memory=True):
+        self.memory = memory
+        self.records = []
+        self._stack = []
+
+    @contextmanager
+    def stage(self, name):
+        """Time the enclosed block as stage `name`."""
+        if self._stack:
+            name = self._stack[-1]['name'] + '/' + name
+        frame = {'name': name, 'peak': 0}
+        if self.memory:
+            frame['current'], peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                self._stack[-1]['peak'] = max(self._stack[-1]['peak'], peak)
+            tracemalloc.reset_peak()
+        self._stack.append(frame)
+        record = {'stage': name}
+        self.records.append(record)
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            record['time'] = perf_counter() - start
+            self._stack.pop()
+            if self.memory:
+                peak = max(frame['peak'], tracemalloc.get_traced_memory()[1])
+                record['peak'] = peak - frame['current']
+                if self._stack:
+                    self._stack[-1]['peak'] = max(self._stack[-1]['peak'],
+                                                  peak)
+
+    def report(self):
+        r"""
+        Summarise the recorded stages.
+        Returns
+        -------
+        report : pandas.core.frame.DataFrame
+            Calls, total and mean wall time in s, share of the total time of
+            the outermost stages and maximum peak memory in MiB per stage, in
+            the order the stages were first entered.
+        """
+        records = pd.DataFrame(self.records, columns=['stage', 'time',
+                                                      'peak'])
+        if records.empty:
+            return records
+        report = records.groupby('stage', sort=False).agg(
+            calls=('time', 'size'), time=('time', 'sum'),
+            time_mean=('time', 'mean'), peak=('peak', 'max'))
+        outer = ~report.index.str.contains('/')
+        report['share'] = report['time'] / report.loc[outer, 'time'].sum()
+        report['peak'] /= 2 ** 20
+        return report
+
+
+def stage(name):
+    """Return the context of stage `name`, a no-op if profiling is off."""
+    if _profiler is None:
+        return _off
+    return _profiler.stage(name)
+
+
+@contextmanager
+def profile(memory=True):
+    r"""
+    Profile the stages of the enclosed block.
+    Parameters
+    ----------
+    memory : bool
+        Also track the peak memory of every stage.
+    Returns
+    -------
+    profiler : StageProfile
+        Profile of the block, see :meth:`StageProfile.report`.
+    Example
+    -------
+    >>> with profile() as profiler:
+    ...     calculate_radiation(...)
+    >>> print(profiler.report())
+    """
+    global _profiler
+    previous = _profiler
+    profiler = StageProfile(memory=memory)
+    started = memory and not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    _profiler = profiler
+    try:
+        yield profiler
+    finally:
+        _profiler = previous
+        if started:
+            tracemalloc.stop()
+
+
+# POPDH_PROFILE=1 profiles the whole run and prints the report at exit,
+# POPDH_PROFILE=time without memory tracking
+if os.environ.get('POPDH_PROFILE'):
+    _profiler = StageProfile(memory=os.environ['POPDH_PROFILE'] != 'time')
+    if _profiler.memory:
+        tracemalloc.start()
+    atexit.register(lambda profiler=_profiler: print(profiler.report()))
@@ -0,0 +1,104 @@
+"""Cache for sun position tables used by the radiation model."""
+from collections import OrderedDict
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+from ratipl import SUN_POSITION_VERSION
+
+
+class SunPositionCache:
+    r"""
+    Least recently used cache of sun positions with optional disk storage.
+    Parameters
+    ----------
+    maxsize : int
+        Maximum number of sun position tables kept in memory.
+    path : str
+        Directory of the on-disk .npz store, no disk storage if None.
+    Note
+    ----
+    The sun position depends only on latitude, longitude, time zone, the
+    timestamps and the sub-steps of interval averaging, these are hashed to
+    identify a table together with :data:`ratipl.SUN_POSITION_VERSION`, so
+    tables of former versions of the model are not used. Cached arrays are
+    read-only.
+    """
+
+    def __init__(self, maxsize=32, path=None):
+        self.maxsize = maxsize
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._tables = OrderedDict()
+
+        if self.path is not None:
+            os.makedirs(self.path, exist_ok=True)
+
+    @staticmethod
+    def key(phi, lam, timezone, datetime, options=None):
+        """Get the hash of a site, a timestamp index and further options."""
+        date = pd.DatetimeIndex(datetime)
+        digest = hashlib.sha1(repr(
+            (SUN_POSITION_VERSION, float(phi), float(lam), str(timezone),
+             str(date.tz))).encode())
+        if options:
+            digest.update(repr(sorted(options.items())).encode())
+        digest.update(date.as_unit('ns').asi8.tobytes())
+        return digest.hexdigest()
+
+    def _file(self, key):
+        return os.path.join(self.path, key + '.npz')
+
+    def get(self, key):
+        """Return the cached sun position for `key` or None."""
+        if key in self._tables:
+            self._tables.move_to_end(key)
+            self.hits += 1
+            return self._tables[key]
+
+        if self.path is not None and os.path.isfile(self._file(key)):
+            with np.load(self._file(key)) as data:
+                sun = {name: data[name] for name in data.files}
+            self._store(key, sun)
+            self.hits += 1
+            return self._tables[key]
+
+        self.misses += 1
+        return None
+
+    def put(self, key, sun):
+        """Add a sun position to the cache."""
+        self._store(key, sun)
+        if self.path is not None:
+            np.savez(self._file(key), **sun)
+
+    def _store(self, key, sun):
+        for value in sun.values():
+            value.flags.writeable = False
+        self._tables[key] = sun
+        self._tables.move_to_end(key)
+        while len(self._tables) > self.maxsize:
+            self._tables.popitem(last=False)
+
+    def invalidate(self, key=None):
+        """Remove `key` (or all tables if None) from memory and disk."""
+        if key is None:
+            keys = list(self._tables)
+            if self.path is not None:
+                keys += [f[:-4] for f in os.listdir(self.path)
+                         if f.endswith('.npz')]
+        else:
+            keys = [key]
+
+        for k in set(keys):
+            self._tables.pop(k, None)
+            if self.path is not None and os.path.isfile(self._file(k)):
+                os.remove(self._file(k))
+
+    def stats(self):
+        """Return hit and miss counters."""
+        return {'hits': self.hits, 'misses': self.misses,
+                'tables': len(self._tables)}